@@ -3,30 +3,168 @@
 
 import os
 import sys
+import glob
 
 from common.pylint import Linter
 from common.git import Git
+from common.classify import BlameClassifier, DiffClassifier
+from common.lease import FileLease, IssueLease, SyncCoordinator
+from common.checks import CheckRunPublisher
+from common.sarif import SarifPublisher
+from common.schedule import FileCosts, Scheduler
+from common.util import util
+from common import store
 
-from slack import slack
+from slack import slack, NotificationQueue
 
 # Executors
-linter = Linter()
+# An overlay generated by profile.py can move expensive checkers out of (or into) this run
+overlay = os.environ.get("AUTOLINT_OVERLAY") or None
+overrides = Linter.overlay(path = overlay) if overlay is not None else None
+linter = Linter(overrides = overrides)
 
 print(f"Branch: {os.environ['REPO_BRANCH']}")
 
+cache = os.environ.get("AUTOLINT_CACHE") or None
+
 git = Git(
     before = os.environ.get("SHA_BEFORE"), 
     after = os.environ.get("SHA_AFTER"), 
     repo = os.environ.get("REPO_NAME"),
     token = os.environ.get("REPO_TOKEN"),
-    branch = os.environ.get("REPO_BRANCH")
+    branch = os.environ.get("REPO_BRANCH"),
+    cache = cache
 )
 
-report = linter.lint(git = git)
+# Tiered linting reports blocking error & fatal issues on the changed files before the full analysis runs
+tier = os.environ.get("AUTOLINT_TIER") or "full"
+reused = None
+
+if tier in ["fast", "tiered"]:
+    
+    changed = git.changed()
+    fast = Linter.fast(overrides = overrides).lint(git = git, classifier = DiffClassifier(git = git), paths = changed)
+    
+    # Without a before commit the fast tier lints every file
+    reused = set(changed if changed is not None else util.files())
+    blocking = fast.counts.errors.total + fast.group(by = "type").get("fatal", 0)
+    
+    linter.terminal(report = fast)
+    
+    print(f"Blocking issues: {blocking}", flush = True)
+    print(f"::set-output name=blocking::{blocking}", flush = True)
+    
+    # The fast tier never syncs issues, that is left to the full pass in a later step
+    if tier == "fast":
+        sys.exit(1 if blocking > 0 else 0)
+
+# Large repositories can be split across a matrix of runners
+shard = int(os.environ.get("SHARD_INDEX") or 0)
+shards = int(os.environ.get("SHARD_COUNT") or 1)
+reports = os.environ.get("REPORT_DIR") or "autolint-reports"
+
+if os.environ.get("REPORT_MERGE", "false") == "true":
+    
+    # Only the merge job syncs issues, using the combined partial reports of every shard
+    paths = list(map(lambda a: os.path.join(reports, f"shard-{a}-of-{shards}.alr"), range(shards)))
+    missing = list(filter(lambda a: not os.path.exists(a), paths))
+    
+    if len(missing) > 0:
+        print(f"Missing shard reports: {', '.join(missing)}")
+        sys.exit(1)
+    
+    report = store.merge(paths = paths)
+    
+    # Each shard only covers the files it linted, once those add up to every file the merged report is complete
+    if report.linted is not None and report.linted.issuperset(util.files()):
+        report.linted = None
+    
+else:
+    
+    # Diff classification marks new issues from a single git diff (or a stored baseline) instead of blaming every file
+    if os.environ.get("AUTOLINT_CLASSIFY", "blame") == "diff":
+        
+        baseline = os.path.join(cache, f"report-{os.environ.get('SHA_BEFORE')}.alr") if cache is not None else None
+        classifier = DiffClassifier(git = git, baseline = store.ReportReader(path = baseline) if baseline and os.path.exists(baseline) else None)
+        
+    else:
+        classifier = BlameClassifier(git = git)
+    
+    # With a time budget, changed files & files with open issues are linted first and a partial report is kept on timeout
+    budget = os.environ.get("AUTOLINT_BUDGET") or None
+    scheduler = None
+    
+    if budget is not None:
+        
+        costs = FileCosts(path = os.path.join(cache, "costs.json") if cache is not None else None)
+        scheduler = Scheduler(budget = float(budget), costs = costs, changed = git.changed() or [], open = list(map(lambda a: a.path, git.remote_issues())))
+    
+    # The shipped rcfile already disables C, R & W, so the fast tier ran the full pass's checkers on the changed files
+    # and its results are reused (by the first shard) rather than linting those files twice
+    paths = list(filter(lambda a: a not in reused, util.files())) if reused is not None else None
+    
+    report = linter.lint(git = git, shard = shard, shards = shards, classifier = classifier, paths = paths, scheduler = scheduler)
+    
+    if reused is not None and shard == 0:
+        
+        report.merge(other = fast)
+        
+        if report.linted is not None:
+            report.linted |= reused
+    
+    git.save()
+    git.close()
+    
+    if scheduler is not None:
+        scheduler.costs.save()
+    
+    if shards > 1:
+        
+        os.makedirs(reports, exist_ok = True)
+        store.save(report = report, path = os.path.join(reports, f"shard-{shard}-of-{shards}.alr"))
+        
+        print(f"Shard {shard + 1}/{shards}: {len(report)} issues in {len(report.reports)} files")
+        sys.exit(0)
+
+# Keep the complete report for this commit so later runs can open it as a baseline
+if cache is not None and not report.partial:
+    
+    os.makedirs(cache, exist_ok = True)
+    
+    baseline = os.path.join(cache, f"report-{os.environ.get('SHA_AFTER')}.alr")
+    store.save(report = report, path = baseline)
+    
+    # Only the newest report can be the next run's baseline, so older ones are removed rather than growing the cache
+    for stale in filter(lambda a: a != baseline, glob.glob(os.path.join(cache, "report-*.alr"))):
+        os.remove(stale)
 
 # linter.terminal(report = report)
 
-count = git.sync_issues(report = report)
+# Results are published as one issue per lint group, a single annotated check run or a code scanning upload
+sink = util.branch_option(spec = os.environ.get("AUTOLINT_SINK") or "", branch = git.branch, default = "issues")
+
+if sink == "checks":
+    publish = CheckRunPublisher(git = git).publish
+elif sink == "sarif":
+    publish = SarifPublisher(git = git).publish
+else:
+    publish = git.sync_issues
+
+# Runs racing on the same branch take a lease, and skip the sync when a newer commit has already been synced
+lease = os.environ.get("AUTOLINT_LEASE") or "none"
+holder = os.environ.get("GIT_RUN") or str(os.getpid())
+
+if lease == "issue":
+    count = SyncCoordinator(git = git, lease = IssueLease(git = git, branch = git.branch, holder = holder), publish = publish).sync(report = report)
+elif lease == "file":
+    count = SyncCoordinator(git = git, lease = FileLease(directory = cache or reports, branch = git.branch, holder = holder), publish = publish).sync(report = report)
+else:
+    count = publish(report = report)
+
+if count is None:
+    
+    # Every lint group is either created or updated by a sync, so the local count matches what it would return
+    count = len(report.hashes)
 
 if count > 0:
     
@@ -72,10 +210,26 @@ if count > 0:
         }
     ]
 
-    # slack.send_blocks(blocks = blocks, sender = sender, receiver = receiver)
+    # Repeated failures with the same issues are only posted once
+    queue = NotificationQueue(sender = sender, state = os.environ.get("SLACK_STATE") or None)
+    queue.push(receiver = receiver, branch = os.environ.get("REPO_BRANCH"), blocks = blocks, issues = report.hashes)
+    queue.flush()
+    
+    # Attach the full report for large regressions, streamed from disk
+    if os.environ.get("SLACK_UPLOAD", "false") == "true":
+        
+        with open("/tmp/autolint.txt", "w") as output:
+            linter.terminal(report = report, output = output)
+            
+        slack.send_file(path = "/tmp/autolint.txt", sender = sender, receiver = receiver, title = f"Autolint report for {os.environ.get('REPO_BRANCH')}")
     
     sys.exit(1)
 
 else:
     
-    print(f"hellow: {count}")
\ No newline at end of file
+    print(f"hellow: {count}")
+    
+    if os.environ.get("SLACK_STATE"):
+        
+        queue = NotificationQueue(sender = slack.lookup_bot(oauth = os.environ.get("SLACK_OAUTH")), state = os.environ.get("SLACK_STATE"))
+        queue.clear(receiver = slack.lookup_channel(name = "github-actions"), branch = os.environ.get("REPO_BRANCH"))
\ No newline at end of file
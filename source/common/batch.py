@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import subprocess
+
+from typing import List, Dict, Tuple, Union
+
+
+class GitBatch:
+    
+    """ Git Batch: Long lived `git cat-file` processes that answer object lookups without spawning per call """
+    
+    def __init__(self, root: str = None):
+        
+        self.root = root
+        self.processes = {}
+        self.trees = {}
+        
+    def process(self, mode: str) -> subprocess.Popen:
+        
+        if mode not in self.processes:
+            self.processes[mode] = subprocess.Popen(["git", "cat-file", f"--{mode}"], stdin = subprocess.PIPE, stdout = subprocess.PIPE, cwd = self.root)
+            
+        return self.processes[mode]
+        
+    def request(self, mode: str, name: str) -> Union[Tuple[str, str, int], None]:
+        
+        process = self.process(mode = mode)
+        
+        process.stdin.write(name.encode("utf-8") + b"\n")
+        process.stdin.flush()
+        
+        # "<sha> <type> <size>", or "<name> missing" & "<name> ambiguous" where the name may contain spaces
+        header = process.stdout.readline().decode("utf-8").rstrip("\n").split(" ")
+        
+        if header[-1] in ("missing", "ambiguous"):
+            return None
+            
+        return header[0], header[1], int(header[2])
+        
+    def info(self, name: str) -> Union[Tuple[str, str, int], None]:
+        
+        return self.request(mode = "batch-check", name = name)
+        
+    def read(self, name: str) -> Union[bytes, None]:
+        
+        header = self.request(mode = "batch", name = name)
+        
+        if header is None:
+            return None
+            
+        process = self.process(mode = "batch")
+        content = process.stdout.read(header[2])
+        
+        # Every object is followed by a newline
+        process.stdout.read(1)
+        
+        return content
+        
+    def sha(self, name: str) -> Union[str, None]:
+        
+        info = self.info(name = name)
+        return info[0] if info is not None else None
+        
+    def entries(self, tree: str) -> Dict[str, Tuple[str, str]]:
+        
+        # Tree objects are "<mode> <name>\0<20 byte sha>" repeated
+        if tree not in self.trees:
+        
+            content = self.read(name = tree) or b""
+            entries = {}
+            position = 0
+            
+            while position < len(content):
+                
+                split = content.index(b"\0", position)
+                mode, name = content[position:split].decode("utf-8").split(" ", 1)
+                entries[name] = (mode, content[split + 1:split + 21].hex())
+                position = split + 21
+                
+            self.trees[tree] = entries
+            
+        return self.trees[tree]
+        
+    def tree(self, revision: str) -> Dict[str, str]:
+        
+        """ Git Batch: Tree
+
+        Args:
+            revision (str): Any commit-ish.
+
+        Returns:
+            Dict[str, str]: The blob SHA of every file in the revision, keyed by path.
+
+        """
+        
+        blobs = {}
+        root = self.sha(name = f"{revision}^{{tree}}")
+        
+        if root is not None:
+            self.walk(tree = root, prefix = "", blobs = blobs)
+            
+        return blobs
+        
+    def walk(self, tree: str, prefix: str, blobs: Dict[str, str]):
+        
+        for name, (mode, sha) in self.entries(tree = tree).items():
+            
+            if mode == "40000":
+                self.walk(tree = sha, prefix = f"{prefix}{name}/", blobs = blobs)
+            elif mode != "160000":
+                blobs[f"{prefix}{name}"] = sha
+                
+    def changed(self, before: str, after: str) -> List[str]:
+        
+        """ Git Batch: Changed
+
+        Args:
+            before (str): The older commit-ish.
+            after (str): The newer commit-ish.
+
+        Returns:
+            List[str]: Paths that were added or modified in after. Identical subtrees are never opened.
+
+        """
+        
+        changed = []
+        self.compare(old = self.sha(name = f"{before}^{{tree}}"), new = self.sha(name = f"{after}^{{tree}}"), prefix = "", changed = changed)
+        
+        return sorted(changed)
+        
+    def compare(self, old: Union[str, None], new: Union[str, None], prefix: str, changed: List[str]):
+        
+        if old == new or new is None:
+            return
+            
+        old_entries = self.entries(tree = old) if old is not None else {}
+        
+        for name, (mode, sha) in self.entries(tree = new).items():
+            
+            previous = old_entries.get(name)
+            
+            if mode == "40000":
+                self.compare(old = previous[1] if previous is not None and previous[0] == "40000" else None, new = sha, prefix = f"{prefix}{name}/", changed = changed)
+            elif mode != "160000" and (previous is None or previous[1] != sha):
+                changed.append(f"{prefix}{name}")
+                
+    def close(self):
+        
+        for process in self.processes.values():
+            process.stdin.close()
+            process.wait()
+            
+        self.processes = {}
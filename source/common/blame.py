@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+from typing import List, Dict, Union
+
+
+class BlameCache:
+    
+    """ Blame Cache: Persistent per-file blame attribution keyed by path & blob SHA """
+    
+    def __init__(self, path: str = None):
+        
+        self.path = path
+        
+        # Commit metadata is shared between lines so it is only stored once
+        # sha -> [author, committer, summary]
+        self.commits: Dict[str, List[str]] = {}
+        
+        # path -> {"blob": sha, "lines": [[sha, line_before, code], ...]}
+        self.files: Dict[str, Dict[str, any]] = {}
+        
+        if self.path is not None and os.path.exists(self.path):
+            
+            with open(self.path) as file:
+                data = json.load(file)
+                
+            self.commits = data["commits"]
+            self.files = data["files"]
+            
+    def lookup(self, path: str, blob: str) -> Union[List[list], None]:
+        
+        entry = self.files.get(path)
+        
+        if entry is None or entry["blob"] != blob:
+            return None
+            
+        return entry["lines"]
+        
+    def latest(self, path: str) -> Union[Dict[str, any], None]:
+        return self.files.get(path)
+        
+    def commit(self, sha: str) -> List[str]:
+        return self.commits[sha]
+        
+    def store(self, path: str, blob: str, lines: List[list], commits: Dict[str, List[str]]):
+        
+        # Only the latest version of each file is kept, older blobs can never be looked up again
+        self.files[path] = {"blob": blob, "lines": lines}
+        self.commits.update(commits)
+        
+    def save(self):
+        
+        if self.path is None:
+            return
+            
+        # Drop commits that are no longer referenced by any cached line
+        referenced = set(line[0] for entry in self.files.values() for line in entry["lines"])
+        self.commits = dict(filter(lambda a: a[0] in referenced, self.commits.items()))
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok = True)
+        
+        with open(self.path, "w") as file:
+            json.dump({"commits": self.commits, "files": self.files}, file)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Dict, Iterator
+
+from .pylint import LintReport
+
+
+class CheckRunPublisher:
+    
+    """ Check Run Publisher: Posts a LintReport as one check run, instead of one issue per lint group """
+    
+    # The checks API accepts at most 50 annotations per request
+    # https://docs.github.com/en/rest/checks/runs#update-a-check-run
+    max_annotations = 50
+    
+    levels = {
+        "fatal": "failure",
+        "error": "failure",
+        "warning": "warning"
+    }
+    
+    def __init__(self, git, name: str = "autolint"):
+        
+        # Requests go through Git.request for its session, rate limit retries & call counting, so a rate limit
+        # part way through does not leave the check run in progress
+        self.git = git
+        self.headers = {"Accept": "application/vnd.github+json"}
+        self.sha = git.after
+        self.name = name
+        
+    def annotations(self, report: LintReport) -> Iterator[Dict[str, any]]:
+        
+        for path, file_report in report.reports.items():
+            for row in file_report.rows:
+                
+                issue = report.issue(row = row)
+                line = max(issue.line, 1)
+                
+                yield {
+                    "path": path,
+                    "start_line": line,
+                    "end_line": line,
+                    "annotation_level": self.levels.get(issue.type, "notice"),
+                    "title": f"[{issue.message_id}] {issue.symbol}",
+                    "message": issue.message
+                }
+                
+    def batches(self, report: LintReport) -> Iterator[List[Dict[str, any]]]:
+        
+        batch = []
+        
+        for annotation in self.annotations(report = report):
+            
+            batch.append(annotation)
+            
+            if len(batch) == self.max_annotations:
+                yield batch
+                batch = []
+                
+        yield batch
+        
+    def request(self, method: str, path: str, json: Dict[str, any]) -> Dict[str, any]:
+        
+        response = self.git.request(method, path, headers = self.headers, json = json)
+        response.raise_for_status()
+        
+        return response.json()
+        
+    def publish(self, report: LintReport) -> int:
+        
+        counts = report.counts
+        blocking = counts.errors.total + report.group(by = "type").get("fatal", 0)
+        
+        output = {
+            "title": f"{blocking} blocking issues" if blocking > 0 else "No blocking issues",
+            "summary": f"{len(report)} issues in {len(report.reports)} files: {counts.errors.total} errors ({counts.errors.new} new), {counts.warnings.total} warnings ({counts.warnings.new} new)."
+        }
+        
+        run = self.request("POST", f"/repos/{self.git.repo}/check-runs", json = {
+            "name": self.name,
+            "head_sha": self.sha,
+            "status": "in_progress"
+        })
+        
+        path = f"/repos/{self.git.repo}/check-runs/{run['id']}"
+        batches = self.batches(report = report)
+        batch = next(batches)
+        
+        # Annotations accumulate across updates, the last batch is sent together with the conclusion
+        for following in batches:
+            self.request("PATCH", path, json = {"output": dict(output, annotations = batch)})
+            batch = following
+            
+        self.request("PATCH", path, json = {
+            "status": "completed",
+            "conclusion": "failure" if blocking > 0 else "success",
+            "output": dict(output, annotations = batch)
+        })
+        
+        # Matches Git.sync_issues, which returns one per open lint group
+        return len(report.hashes)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Dict, Union
+from collections import Counter
+
+from .diff import IntervalIndex
+
+
+class BlameClassifier:
+    
+    """ Blame Classifier: An issue is new when git blame attributes its line to a commit in the push """
+    
+    def __init__(self, git):
+        
+        self.git = git
+        
+    def blame(self, path: str):
+        return self.git.blame(path = path)
+        
+    def new(self, path: str, issue: Dict[str, any], blame) -> bool:
+        
+        try:
+            return blame[issue["line"] - 1].new
+        except IndexError:
+            return True
+            
+
+class DiffClassifier:
+    
+    """ Diff Classifier: An issue is new when its line was added by the push, or it is missing from the baseline report """
+    
+    def __init__(self, git, baseline = None):
+        
+        self.git = git
+        
+        # An optional store.ReportReader for the report at the before SHA
+        self.baseline = baseline
+        
+        # Baseline issue keys still available to be matched, per file
+        self.remaining: Dict[str, Counter] = {}
+        self.indexes: Dict[str, IntervalIndex] = {}
+        
+    def blame(self, path: str):
+        
+        # No blame is run, which is the whole point of this classifier
+        return None
+        
+    def key(self, issue: Dict[str, any]) -> tuple:
+        return (issue["type"], issue["symbol"], issue["message-id"], issue["message"])
+        
+    def new(self, path: str, issue: Dict[str, any], blame) -> bool:
+        
+        if self.baseline is not None:
+            return self.unmatched(path = path, issue = issue)
+        
+        # Without a valid before SHA (e.g. a new branch) everything in the push is new
+        if self.git.before not in self.git.history:
+            return True
+        
+        if path not in self.indexes:
+            file_diff = self.git.diff().get(path)
+            self.indexes[path] = file_diff.index if file_diff is not None else IntervalIndex(ranges = [])
+            
+        return issue["line"] in self.indexes[path]
+        
+    def unmatched(self, path: str, issue: Dict[str, any]) -> bool:
+        
+        # Issues are matched on their content rather than line, so code moving around does not make them new
+        if path not in self.remaining:
+            self.remaining[path] = Counter(map(self.key, self.baseline.issues(path = path)))
+            
+        key = self.key(issue)
+        
+        if self.remaining[path][key] > 0:
+            self.remaining[path][key] -= 1
+            return False
+            
+        return True
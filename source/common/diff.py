@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+from bisect import bisect_right
+from typing import List, Dict, Union
+
+
+# Data Structures
+
+class IntervalIndex:
+    
+    """ Interval Index: Answers whether a line falls inside any of a set of half open (start, end) ranges """
+    
+    def __init__(self, ranges: List[tuple]):
+        
+        ranges = sorted(ranges)
+        
+        self.starts = list(map(lambda a: a[0], ranges))
+        self.ends = list(map(lambda a: a[1], ranges))
+        
+    def __contains__(self, line: int) -> bool:
+        
+        index = bisect_right(self.starts, line) - 1
+        return index >= 0 and line < self.ends[index]
+        
+    def __len__(self) -> int:
+        return len(self.starts)
+
+class Hunk:
+    
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int):
+        
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        
+    @property
+    def old_end(self) -> int:
+        return self.old_start + self.old_count
+        
+    @property
+    def new_end(self) -> int:
+        return self.new_start + self.new_count
+        
+    @staticmethod
+    def from_header(header: str):
+        
+        # @@ -old_start[,old_count] +new_start[,new_count] @@
+        match = re.match(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@", header)
+        old_start, old_count, new_start, new_count = match.groups()
+        
+        old_count = 1 if old_count is None else int(old_count)
+        new_count = 1 if new_count is None else int(new_count)
+        
+        # A zero count start refers to the line before the hunk, so shift it onto the first affected line
+        return Hunk(
+            old_start = int(old_start) + (1 if old_count == 0 else 0), 
+            old_count = old_count, 
+            new_start = int(new_start) + (1 if new_count == 0 else 0), 
+            new_count = new_count
+        )
+        
+        
+class FileDiff:
+    
+    def __init__(self, path: str, hunks: List[Hunk]):
+        
+        self.path = path
+        self.hunks = hunks
+        
+    def map_line(self, line: int) -> Union[int, None]:
+        
+        """ File Diff: Map Line
+
+        Args:
+            line (int): A 1-indexed line number in the old version of the file.
+
+        Returns:
+            Union[int, None]: The line number in the new version, or None if the line was changed or removed.
+
+        """
+        
+        offset = 0
+        
+        for hunk in self.hunks:
+            
+            if line < hunk.old_start:
+                break
+            
+            if line < hunk.old_end:
+                return None
+                
+            offset += hunk.new_count - hunk.old_count
+            
+        return line + offset
+        
+    @property
+    def added(self) -> List[tuple]:
+        
+        # Half open (start, end) ranges of added lines in the new version
+        return [(hunk.new_start, hunk.new_end) for hunk in self.hunks if hunk.new_count > 0]
+        
+    @property
+    def index(self) -> IntervalIndex:
+        return IntervalIndex(ranges = self.added)
+        
+
+# Parsing
+        
+def parse(output: str) -> Dict[str, FileDiff]:
+    
+    """ Parse: Converts `git diff -U0` output into a FileDiff per new path """
+    
+    diffs = {}
+    current = None
+    
+    for line in output.split("\n"):
+        
+        if line.startswith("+++ "):
+            
+            # Git appends a tab to the header when the path contains spaces
+            path = line[4:].rstrip("\t")
+            
+            if path == "/dev/null":
+                current = None
+                continue
+            
+            current = FileDiff(path = path[2:] if path.startswith("b/") else path, hunks = [])
+            diffs[current.path] = current
+            
+        elif line.startswith("@@ ") and current is not None:
+            current.hunks.append(Hunk.from_header(header = line))
+            
+    return diffs
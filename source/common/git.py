@@ -1,20 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
 import json
+import time
 import requests
 
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Union
 from functools import reduce
 
 from .util import util
 from .pylint import LintReport, LintIssue
+from .blame import BlameCache
+from .batch import GitBatch
+from . import diff
 
 # Data Structures
 
 class GitIssue:
 
-    def __init__(self, number: int, title: str, body: str, labels: List[str], assignees: List[str], local: bool, branch: str):
+    def __init__(self, number: int, title: str, body: str, labels: List[str], assignees: List[str], local: bool, branch: str, path: str = None):
 
         self.number = number
         self.title = title
@@ -23,6 +28,7 @@ class GitIssue:
         self.assignees = assignees
         self.local = local
         self.branch = branch
+        self.path = path
         
     @staticmethod
     def from_json(data: Dict[str, any], branch: str):
@@ -44,7 +50,8 @@ class GitIssue:
             labels = labels,
             assignees = assignees,
             local = False,
-            branch = branch
+            branch = branch,
+            path = data["title"].rsplit(" in ", 1)[-1]
         )
 
     @staticmethod
@@ -70,15 +77,19 @@ class GitIssue:
             branch_label = "ᚶ develop"
         else:
             branch_label = "ᚶ feature"
+            
+        # Without blame (e.g. diff classification) nobody is known to own the issue, so None leaves the remote assignees alone
+        blamed = list(filter(lambda a: a.blame is not None, lints))
 
         return GitIssue(
             number = None,
             title = f"[{first.message_id}] [{branch}] " + first.symbol.replace("-", " ").capitalize() + " " + first.type + " in " + first.path,
             body = common_warning + "".join(list(map(lambda a: base.format(a.message, a.line), lints))),
             labels = ["autolint", first.type, branch_label],
-            assignees = list(set(list(map(lambda a: a.blame.author, lints))).intersection(users)),
+            assignees = list(set(list(map(lambda a: a.blame.author, blamed))).intersection(users)) if len(blamed) > 0 else None,
             local = True,
-            branch = branch
+            branch = branch,
+            path = first.path
         )
         
     def prepare_create(self) -> Dict[str, any]:
@@ -87,7 +98,7 @@ class GitIssue:
             "title": self.title,
             "body": self.body,
             "labels": self.labels,
-            "assignees": self.assignees
+            "assignees": self.assignees or []
         }
         
     def prepare_close(self) -> Dict[str, any]:
@@ -98,68 +109,238 @@ class GitIssue:
         
     def prepare_update(self) -> Dict[str, any]:
         
-        return {
+        update = {
             "title": self.title,
             "body": self.body,
             "labels": self.labels,
-            "assignees": self.assignees,
             "state": "open"
         }
+        
+        if self.assignees is not None:
+            update["assignees"] = self.assignees
+            
+        return update
     
             
 class GitBlame:
 
-    def __init__(self, porcelain, focus):
+    def __init__(self, sha: str, line_before: str, line_after: str, line_group: str, author: str, committer: str, summary: str, code: str, focus):
+
+        self.sha = sha
+        self.line_before = line_before
+        self.line_after = line_after
+        self.line_group = line_group
+
+        self.new = self.sha in focus
+        self.code = code
+
+        self.author = author
+        self.committer = committer
+        self.summary = summary
+        
+    @staticmethod
+    def from_porcelain(porcelain, focus):
 
         if porcelain[0].count(" ") == 2:
-            self.sha, self.line_before, self.line_after = porcelain.pop(0).split(" ")
-            self.line_group = None
+            sha, line_before, line_after = porcelain.pop(0).split(" ")
+            line_group = None
         else:
-            self.sha, self.line_before, self.line_after, self.line_group = porcelain.pop(0).split(" ")
+            sha, line_before, line_after, line_group = porcelain.pop(0).split(" ")
 
-        self.new = self.sha in focus
-        self.code = porcelain.pop(-1)
+        code = porcelain.pop(-1)
 
         safe_split = lambda a: tuple(a) if len(a) == 2 else tuple(a + [""])
 
         lookup = dict(map(lambda a: safe_split(a.split(" ", 1)), porcelain))
         
-        self.author = lookup["author"]
-        self.committer = lookup["committer"]
-        self.summary = lookup["summary"]
+        return GitBlame(
+            sha = sha,
+            line_before = line_before,
+            line_after = line_after,
+            line_group = line_group,
+            author = lookup["author"],
+            committer = lookup["committer"],
+            summary = lookup["summary"],
+            code = code,
+            focus = focus
+        )
+        
+    @staticmethod
+    def from_cache(row: List[str], commit: List[str], line: int, focus):
+        
+        sha, line_before, code = row
+        author, committer, summary = commit
+        
+        return GitBlame(
+            sha = sha,
+            line_before = line_before,
+            line_after = str(line),
+            line_group = None,
+            author = author,
+            committer = committer,
+            summary = summary,
+            code = code,
+            focus = focus
+        )
+        
+    def to_cache(self) -> List[str]:
+        return [self.sha, self.line_before, self.code]
         
 
                 
 # Executors
             
 class Git:
+    
+    # Collaborator logins keyed by API & repository
+    collaborators: Dict[str, Set[str]] = {}
 
-    def __init__(self, before: str, after: str, repo: str, token: str, branch: str):
+    def __init__(self, before: str, after: str, repo: str, token: str, branch: str, cache: str = None, api: str = None, root: str = None, session: requests.Session = None):
 
         self.before = before
         self.after = after
         self.repo = repo
         self.auth = {"Authorization": f"Bearer {token}"}
         self.branch = branch
+        
+        # The working copy that git commands run in, None for the current directory
+        self.root = root
+        
+        # Every API call goes through one pooled session (which may be shared between repositories), and is counted
+        self.api = api or util.github_api
+        self.session = session or requests.Session()
+        self.calls = 0
+        self.retries = 3
 
         # Produce a list of the git hashes that are included in the commit
-        shas = util.exec("git log --format=format:%H").split("\n")
+        shas = util.exec("git log --format=format:%H", cwd = self.root).split("\n")
         self.focus = shas[util.safe_index(shas, self.after):util.safe_index(shas, self.before)]
-
-    def blame(self, path: str) -> List[GitBlame]:
-
-        # Produce a git blame for each line in the file
-        path = path.replace(" ", "\ ")
-        porcelain = util.exec(f"git blame --line-porcelain {path}").split("\n")
+        self.history = set(shas)
+        
+        # Blame attribution is carried between runs when a cache directory is provided
+        self.blames = BlameCache(path = os.path.join(cache, "blame.json") if cache else None)
+        self.trees = {}
+        self.diffs = None
+        
+        # Object lookups share long lived cat-file processes instead of spawning git per call
+        self.batch = GitBatch(root = self.root)
+        
+    def tree(self, sha: str) -> Dict[str, str]:
+        
+        # Map every path in the commit to its blob SHA
+        if sha not in self.trees:
+            self.trees[sha] = self.batch.tree(revision = sha) if sha in self.history else {}
+                
+        return self.trees[sha]
+        
+    def diff(self) -> Dict[str, diff.FileDiff]:
+        
+        # Zero context diff of the whole push, shared by every file
+        if self.diffs is None:
+            self.diffs = diff.parse(util.exec(f"git diff -U0 --no-renames --no-color {self.before} {self.after}", cwd = self.root))
+            
+        return self.diffs
+        
+    def changed(self) -> Union[List[str], None]:
+        
+        # Python files added or modified by the push, or None when there is no before SHA to compare against
+        if self.before not in self.history:
+            return None
+            
+        return list(filter(lambda a: a.endswith(".py") and os.path.exists(os.path.join(self.root or "", a)), self.batch.changed(before = self.before, after = self.after)))
+        
+    def porcelain(self, output: str) -> List[GitBlame]:
+        
+        porcelain = output.split("\n")
         endpoints = [index + 2 for index, line in enumerate(porcelain) if line[0:9] == "filename "]
         startpoints = [0] + endpoints[:-1]
 
         return list(map(
             lambda a: 
-            GitBlame(porcelain = porcelain[a[0]:a[1]], focus = self.focus), 
+            GitBlame.from_porcelain(porcelain = porcelain[a[0]:a[1]], focus = self.focus), 
             zip(startpoints, endpoints)
         ))
 
+    def blame(self, path: str) -> List[GitBlame]:
+        
+        blob = self.tree(self.after).get(path)
+        
+        if blob is None:
+            return self.full_blame(path = path)
+        
+        rows = self.blames.lookup(path = path, blob = blob)
+        
+        if rows is not None:
+            blames = list(map(
+                lambda a: 
+                GitBlame.from_cache(row = a[1], commit = self.blames.commit(sha = a[1][0]), line = a[0] + 1, focus = self.focus), 
+                enumerate(rows)
+            ))
+        else:
+            blames = self.incremental_blame(path = path)
+            
+        if blames is None:
+            blames = self.full_blame(path = path)
+            
+        self.blames.store(
+            path = path, 
+            blob = blob, 
+            lines = list(map(lambda a: a.to_cache(), blames)), 
+            commits = dict(map(lambda a: (a.sha, [a.author, a.committer, a.summary]), blames))
+        )
+        
+        return blames
+        
+    def full_blame(self, path: str) -> List[GitBlame]:
+
+        # Produce a git blame for each line in the file
+        # The blame is pinned to the after commit so that it matches the blob it is cached against
+        path = path.replace(" ", "\ ")
+        revision = f"{self.after} -- " if self.after in self.history else ""
+        return self.porcelain(output = util.exec(f"git blame --line-porcelain {revision}{path}", cwd = self.root))
+        
+    def incremental_blame(self, path: str) -> Union[List[GitBlame], None]:
+        
+        # The cached blame can only be reused if it belongs to the file as it was before the push
+        previous = self.blames.latest(path = path)
+        
+        if previous is None or previous["blob"] != self.tree(self.before).get(path) or path not in self.diff():
+            return None
+            
+        file_diff = self.diff()[path]
+        length = len(previous["lines"]) + sum(map(lambda a: a.new_count - a.old_count, file_diff.hunks))
+        blames = [None] * length
+        
+        # Unchanged lines keep their attribution and are shifted through the hunk mapping
+        for index, row in enumerate(previous["lines"]):
+            
+            line = file_diff.map_line(line = index + 1)
+            
+            if line is not None:
+                blames[line - 1] = GitBlame.from_cache(row = row, commit = self.blames.commit(sha = row[0]), line = line, focus = self.focus)
+                
+        # Only the added lines need to be blamed again
+        if len(file_diff.added) > 0:
+        
+            ranges = " ".join(map(lambda a: f"-L {a[0]},{a[1] - 1}", file_diff.added))
+            escaped = path.replace(" ", "\ ")
+            
+            for blame in self.porcelain(output = util.exec(f"git blame --line-porcelain {ranges} {self.after} -- {escaped}", cwd = self.root)):
+                blames[int(blame.line_after) - 1] = blame
+                
+        if None in blames:
+            return None
+                
+        return blames
+        
+    def save(self):
+        
+        self.blames.save()
+        
+    def close(self):
+        
+        self.batch.close()
+
     def local_issues(self, report: LintReport) -> List[GitIssue]:
         
         issues = []
@@ -171,66 +352,79 @@ class Git:
                 
         return issues
         
-    def remote_issues(self) -> List[GitIssue]:
+    def request(self, method: str, path: str, headers: Dict[str, str] = None, **kwargs) -> requests.Response:
         
-        issues = []
+        # Extra headers (e.g. Accept for the checks & code scanning APIs) are sent alongside the token
+        headers = dict(self.auth, **(headers or {}))
         
-        page = 1
-        max = 100
-        finished = False
-        
-        empty = "{}"
-        url = f"https://api.github.com/repos/{self.repo}/issues?per_page={max}&state=open&page={empty}"
+        for attempt in range(self.retries + 1):
             
-        while not finished:
-        
-            response = requests.get(url.format(page), headers=self.auth)
+            self.calls += 1
+            response = self.session.request(method, f"{self.api}{path}", headers = headers, **kwargs)
             
-            issues += list(filter(
-                lambda a: 
-                a is not None, 
-                map(
-                    lambda b: 
-                    GitIssue.from_json(data=b, branch=self.branch), 
-                    response.json()
-                )
-            ))
+            # Secondary rate limits send Retry-After, primary ones send the reset time once the quota is used up
+            if response.status_code == 429 or (response.status_code == 403 and (response.headers.get("Retry-After") or response.headers.get("X-RateLimit-Remaining") == "0")):
+                
+                if "Retry-After" in response.headers:
+                    delay = float(response.headers["Retry-After"])
+                else:
+                    delay = max(float(response.headers.get("X-RateLimit-Reset", 0)) - time.time(), 1)
+                    
+                if attempt == self.retries:
+                    break
+                    
+                print(f"Rate limited, retrying {method} {path} in {delay:.0f}s")
+                time.sleep(delay)
+                continue
+                
+            return response
             
-            if len(issues) / page < max:
-                finished = True
-        
-            page += 1
+        # A rate limited response is not a result, so callers like paginate must never read it as one
+        response.raise_for_status()
         
-        return issues
-        
-    def remote_users(self) -> Set[str]:
+        return response
         
-        users = []
+    def paginate(self, path: str, max: int = 100) -> List[Dict[str, any]]:
         
+        items = []
         page = 1
-        max = 100
-        finished = False
         
-        empty = "{}"
-    
-        url = f"https://api.github.com/repos/{self.repo}/collaborators?per_page={max}&affiliation=all&page={empty}"
+        while True:
             
-        while not finished:
-        
-            response = requests.get(url.format(page), headers=self.auth)
+            results = self.request("GET", f"{path}&per_page={max}&page={page}").json()
+            items += results
             
-            users += list(map(
+            # A short page is the last one, whatever is filtered out of it afterwards
+            if len(results) < max:
+                return items
+                
+            page += 1
+        
+    def remote_issues(self) -> List[GitIssue]:
+        
+        return list(filter(
+            lambda a: 
+            a is not None, 
+            map(
+                lambda b: 
+                GitIssue.from_json(data=b, branch=self.branch), 
+                self.paginate(f"/repos/{self.repo}/issues?state=open")
+            )
+        ))
+        
+    def remote_users(self) -> Set[str]:
+        
+        # Collaborators rarely change during a run, so every Git for the same repository shares them
+        key = f"{self.api}/{self.repo}"
+        
+        if key not in Git.collaborators:
+            Git.collaborators[key] = set(map(
                 lambda a:
                 a["login"],
-                response.json()
+                self.paginate(f"/repos/{self.repo}/collaborators?affiliation=all")
             ))
             
-            if len(users) / page < max:
-                finished = True
-        
-            page += 1
-        
-        return set(users)
+        return Git.collaborators[key]
         
     def sync_issues(self, report: LintReport) -> int:
 
@@ -245,6 +439,10 @@ class Git:
             else:
                 updates[remote.title] = {"local": None, "remote": remote}
 
+        # Issues for files that were deleted or renamed are fixed, even when a partial report never linted them
+        files = set(util.files(root = self.root))
+        removed = set(filter(lambda a: a is not None and a not in files, map(lambda b: b["remote"].path, filter(lambda c: c["remote"] is not None, updates.values()))))
+
         count = 0
 
         for title, update in updates.items():
@@ -252,7 +450,7 @@ class Git:
             if update["remote"] is None:
                 self.create_issue(issue = update["local"])
                 count += 1
-            elif update["local"] is None and self.branch == update["remote"].branch:
+            elif update["local"] is None and self.branch == update["remote"].branch and (report.covers(path = update["remote"].path) or update["remote"].path in removed):
                 self.close_issue(issue = update["remote"])
             elif update["local"] is not None and update["remote"] is not None:
                 self.update_issue(new = update["local"], old = update["remote"])
@@ -262,9 +460,9 @@ class Git:
 
     def create_issue(self, issue: GitIssue): 
 
-        response = requests.post(
-            f"https://api.github.com/repos/{self.repo}/issues", 
-            headers = self.auth, 
+        response = self.request(
+            "POST",
+            f"/repos/{self.repo}/issues", 
             json = issue.prepare_create()
         )
         
@@ -273,20 +471,20 @@ class Git:
 
     def close_issue(self, issue: GitIssue):
 
-        response = requests.patch(
-            f"https://api.github.com/repos/{self.repo}/issues/{issue.number}", 
-            headers = self.auth, 
+        response = self.request(
+            "PATCH",
+            f"/repos/{self.repo}/issues/{issue.number}", 
             json = issue.prepare_close()
         )
 
     def update_issue(self, new: GitIssue, old: GitIssue):
 
-        if (new.title == old.title) and (new.body == old.body) and (set(new.labels) == set(old.labels)) and (set(new.assignees) == set(old.assignees)):
+        if (new.title == old.title) and (new.body == old.body) and (set(new.labels) == set(old.labels)) and (new.assignees is None or set(new.assignees) == set(old.assignees)):
             print("No update required")
             return
 
-        response = requests.patch(
-            f"https://api.github.com/repos/{self.repo}/issues/{old.number}", 
-            headers = self.auth, 
+        response = self.request(
+            "PATCH",
+            f"/repos/{self.repo}/issues/{old.number}", 
             json = new.prepare_update()
         )
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import abc
+import json
+import time
+import fcntl
+import contextlib
+
+from typing import List, Dict, Union
+
+from .util import util
+
+
+class Lease(abc.ABC):
+    
+    """ Lease: A per-branch, time limited claim that only one run may sync issues at a time """
+    
+    # Whether guard() really locks around a read & write, without it a claim has to be read back after a delay
+    atomic = False
+    
+    def __init__(self, branch: str, holder: str, ttl: float = 600, wait: float = 300, poll: float = 5, clock = time.time, sleep = time.sleep):
+        
+        self.branch = branch
+        self.holder = holder
+        self.ttl = ttl
+        self.wait = wait
+        self.poll = poll
+        self.clock = clock
+        self.sleep = sleep
+        
+    @abc.abstractmethod
+    def read(self) -> Dict[str, any]:
+        raise NotImplementedError("The read method needs to be implemented")
+        
+    @abc.abstractmethod
+    def write(self, state: Dict[str, any]):
+        raise NotImplementedError("The write method needs to be implemented")
+        
+    def guard(self):
+        
+        # Backends that can lock around a read & write override this, others rely on reading the write back
+        return contextlib.nullcontext()
+        
+    def available(self, state: Dict[str, any]) -> bool:
+        
+        return state.get("holder") in [None, self.holder] or state.get("expires", 0) < self.clock()
+        
+    def acquire(self) -> bool:
+        
+        deadline = self.clock() + self.wait
+        
+        while True:
+            
+            with self.guard():
+                
+                state = self.read()
+                
+                if self.available(state = state):
+                    self.write(state = dict(state, holder = self.holder, expires = self.clock() + self.ttl))
+                    
+                    # Last writer wins, so the claim is only read back after one poll interval. A run whose write lands
+                    # in that interval overwrites this one & is seen here, slower competing writes can still go unnoticed
+                    if not self.atomic:
+                        self.sleep(self.poll)
+                    
+                    if self.read().get("holder") == self.holder:
+                        return True
+                    
+            if self.clock() >= deadline:
+                return False
+                
+            self.sleep(self.poll)
+            
+    def release(self, synced: Dict[str, any] = None):
+        
+        with self.guard():
+            
+            state = self.read()
+            
+            if state.get("holder") != self.holder:
+                return
+                
+            state = dict(state, holder = None, expires = 0)
+            
+            if synced is not None:
+                state["synced"] = synced
+                
+            self.write(state = state)
+            
+    @property
+    def synced(self) -> Union[Dict[str, any], None]:
+        
+        # The {"sha"} of the last commit whose issues were synced on this branch
+        return self.read().get("synced")
+        
+        
+class FileLease(Lease):
+    
+    """ File Lease: Keeps the lease in a local lock file, for single machines & tests """
+    
+    atomic = True
+    
+    def __init__(self, directory: str, branch: str, holder: str, **kwargs):
+        
+        super().__init__(branch = branch, holder = holder, **kwargs)
+        
+        os.makedirs(directory, exist_ok = True)
+        
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", branch)
+        self.path = os.path.join(directory, f"{name}.lease")
+        self.lock = os.path.join(directory, f"{name}.lock")
+        
+    @contextlib.contextmanager
+    def guard(self):
+        
+        with open(self.lock, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        
+    def read(self) -> Dict[str, any]:
+        
+        if not os.path.exists(self.path):
+            return {}
+            
+        with open(self.path) as file:
+            return json.load(file)
+            
+    def write(self, state: Dict[str, any]):
+        
+        with open(self.path + ".tmp", "w") as file:
+            json.dump(state, file)
+            
+        os.replace(self.path + ".tmp", self.path)
+        
+        
+class IssueLease(Lease):
+    
+    """ Issue Lease: Keeps the lease as JSON in the body of a closed marker issue, so every runner can see it """
+    
+    label = "autolint-lease"
+    
+    def __init__(self, git, branch: str, holder: str, **kwargs):
+        
+        super().__init__(branch = branch, holder = holder, **kwargs)
+        
+        # Calls go through Git.request for its rate limit retries & call counting
+        self.git = git
+        self.title = f"[{self.label}] [{branch}]"
+        self.number = None
+        
+    def markers(self) -> List[Dict[str, any]]:
+        
+        return sorted(filter(
+            lambda a: 
+            a["title"] == self.title, 
+            self.git.paginate(f"/repos/{self.git.repo}/issues?labels={self.label}&state=all")
+        ), key = lambda b: b["number"])
+        
+    def marker(self) -> Dict[str, any]:
+        
+        if self.number is not None:
+            return self.git.request("GET", f"/repos/{self.git.repo}/issues/{self.number}").json()
+        
+        markers = self.markers()
+        
+        if len(markers) == 0:
+            
+            # The marker is closed straight away so it never shows up in the open issue list
+            issue = self.git.request("POST", f"/repos/{self.git.repo}/issues", json = {"title": self.title, "body": "{}", "labels": [self.label]}).json()
+            self.git.request("PATCH", f"/repos/{self.git.repo}/issues/{issue['number']}", json = {"state": "closed"})
+            
+            # Runs that start together can each create a marker, so all of them settle on the lowest numbered one
+            markers = self.markers() or [issue]
+        
+        self.number = markers[0]["number"]
+        
+        return markers[0]
+        
+    def read(self) -> Dict[str, any]:
+        
+        try:
+            return json.loads(self.marker()["body"] or "{}")
+        except ValueError:
+            return {}
+        
+    def write(self, state: Dict[str, any]):
+        
+        if self.number is None:
+            self.marker()
+        
+        self.git.request("PATCH", f"/repos/{self.git.repo}/issues/{self.number}", json = {"body": json.dumps(state)})
+        
+        
+class SyncCoordinator:
+    
+    """ Sync Coordinator: Wraps a publisher so racing runs on one branch only write the latest state """
+    
+    def __init__(self, git, lease: Lease, publish = None):
+        
+        self.git = git
+        self.lease = lease
+        
+        # Anything that takes a report & returns the synced count, e.g. CheckRunPublisher.publish
+        self.publish = publish or git.sync_issues
+        
+    def superseded(self) -> bool:
+        
+        synced = self.lease.synced
+        
+        if synced is None:
+            return False
+            
+        if synced["sha"] == self.git.after:
+            return True
+            
+        # Newer means descended from this commit, commit times are too coarse & are rewritten by rebases.
+        # A synced commit that is missing from this clone makes merge-base fail, and the sync goes ahead
+        return util.exec(f"git merge-base {self.git.after} {synced['sha']}", cwd = self.git.root).strip() == self.git.after
+        
+    def sync(self, report) -> Union[int, None]:
+        
+        """ Sync Coordinator: Sync
+
+        Args:
+            report (LintReport): The report to sync as issues.
+
+        Returns:
+            Union[int, None]: The number of open issues synced, or None if the sync was skipped.
+
+        """
+        
+        if self.superseded():
+            print(f"Skipping sync, a newer commit than {self.git.after} has already been synced")
+            return None
+        
+        if not self.lease.acquire():
+            print(f"Skipping sync, the {self.git.branch} lease is still held by another run")
+            return None
+            
+        synced = None
+        
+        try:
+            
+            # A newer run may have synced while this one was waiting for the lease
+            if self.superseded():
+                print(f"Skipping sync, a newer commit than {self.git.after} was synced while waiting")
+                return None
+            
+            count = self.publish(report = report)
+            synced = {"sha": self.git.after}
+            
+            return count
+            
+        finally:
+            self.lease.release(synced = synced)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import atexit
+import functools
+
+from typing import List, Dict
+
+# Pylint plugin
+#
+# Loaded with --load-plugins=common.profiling and AUTOLINT_PROFILE=<path>, it wraps every checker
+# callback with a timer and dumps the wall time per checker & file when pylint exits
+
+hooks = ["process_module", "process_tokens", "open", "close"]
+
+
+def register(linter):
+    
+    # Checkers are wrapped in load_configuration, once every plugin has registered its own
+    pass
+    
+def load_configuration(linter):
+    
+    path = os.environ.get("AUTOLINT_PROFILE")
+    
+    if path is None:
+        return
+    
+    timings = {}
+    messages = {}
+    
+    def timed(checker: str, method, project: bool):
+        
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            
+            start = time.perf_counter()
+            
+            try:
+                return method(*args, **kwargs)
+            finally:
+                
+                # Work done in close() (e.g. duplicate-code) belongs to the whole project rather than one file
+                file = "<project>" if project else getattr(linter, "current_file", None) or "<project>"
+                files = timings.setdefault(checker, {})
+                files[file] = files.get(file, 0) + time.perf_counter() - start
+                
+        return wrapper
+    
+    for checker in linter.get_checkers():
+        
+        if checker is linter:
+            continue
+        
+        for message_id in getattr(checker, "msgs", {}).keys():
+            messages[message_id] = checker.name
+        
+        for name in dir(checker):
+            if name.startswith("visit_") or name.startswith("leave_") or name in hooks:
+                setattr(checker, name, timed(checker = checker.name, method = getattr(checker, name), project = name == "close"))
+                
+    def dump():
+        
+        with open(path, "w") as file:
+            json.dump({"timings": timings, "messages": messages}, file)
+            
+    atexit.register(dump)
+    
+    
+# Reporting
+
+class CheckerProfile:
+    
+    def __init__(self, timings: Dict[str, Dict[str, float]], messages: Dict[str, str], issues: List[Dict[str, any]]):
+        
+        self.timings = timings
+        self.messages = messages
+        
+        # Message ids owned by each checker, and how many messages each checker actually produced
+        self.ids: Dict[str, List[str]] = {}
+        self.counts: Dict[str, int] = dict(map(lambda a: (a, 0), timings.keys()))
+        
+        for message_id, checker in messages.items():
+            self.ids.setdefault(checker, []).append(message_id)
+            
+        for issue in issues:
+            checker = messages.get(issue["message-id"], "unknown")
+            self.counts[checker] = self.counts.get(checker, 0) + 1
+            
+    @staticmethod
+    def load(path: str, issues: List[Dict[str, any]]):
+        
+        with open(path) as file:
+            data = json.load(file)
+            
+        return CheckerProfile(timings = data["timings"], messages = data["messages"], issues = issues)
+        
+    @property
+    def total(self) -> float:
+        return sum(map(lambda a: sum(a.values()), self.timings.values()))
+        
+    def ranking(self) -> List[Dict[str, any]]:
+        
+        """ Checker Profile: Ranking
+
+        Returns:
+            List[Dict[str, any]]: Every checker with its seconds, share of the run, message count and slowest files,
+                most expensive first.
+
+        """
+        
+        total = self.total or 1
+        ranking = []
+        
+        for checker in set(self.timings.keys()) | set(self.counts.keys()):
+            
+            files = self.timings.get(checker, {})
+            seconds = sum(files.values())
+            
+            ranking.append({
+                "checker": checker,
+                "seconds": seconds,
+                "share": seconds / total,
+                "messages": self.counts.get(checker, 0),
+                "files": sorted(files.items(), key = lambda a: -a[1])[:5]
+            })
+            
+        return sorted(ranking, key = lambda a: -a["seconds"])
+        
+    def expensive(self, share: float = 0.1, rate: float = 1) -> List[str]:
+        
+        # Checkers that take a large share of the run but produce few messages for the time they take
+        return list(map(
+            lambda a: a["checker"], 
+            filter(lambda a: a["share"] >= share and a["messages"] / max(a["seconds"], 1e-6) < rate and a["checker"] in self.ids, self.ranking())
+        ))
+        
+    def overlays(self, directory: str, checkers: List[str]) -> Dict[str, str]:
+        
+        """ Checker Profile: Overlays
+
+        Args:
+            directory (str): Where to write the overlay files.
+            checkers (List[str]): The checkers to move out of the main run.
+
+        Returns:
+            Dict[str, str]: The paths of the "main" overlay, which disables the checkers, and the "scheduled" overlay,
+                which runs only them. Either can be passed to Linter.overlay as pylint overrides.
+
+        """
+        
+        ids = sorted(message_id for checker in checkers for message_id in self.ids.get(checker, []))
+        paths = {"main": os.path.join(directory, "main.pylintrc"), "scheduled": os.path.join(directory, "scheduled.pylintrc")}
+        
+        os.makedirs(directory, exist_ok = True)
+        
+        with open(paths["main"], "w") as file:
+            file.write(f"# Generated by autolint profiling, moves {', '.join(checkers)} to the scheduled job\n\n")
+            file.write("[MESSAGES CONTROL]\ndisable=" + ",\n        ".join(ids) + "\n")
+            
+        with open(paths["scheduled"], "w") as file:
+            file.write(f"# Generated by autolint profiling, runs only {', '.join(checkers)}\n\n")
+            file.write("[MESSAGES CONTROL]\ndisable=all\nenable=" + ",\n       ".join(ids) + "\n")
+            
+        return paths
+        
+    def print(self, limit: int = 20):
+        
+        print("")
+        print(f" *** Checker profile: {self.total:.2f}s ***")
+        print("")
+        
+        for entry in self.ranking()[:limit]:
+            
+            print(f" {entry['seconds']:8.3f}s {entry['share'] * 100:5.1f}% {entry['messages']:>6} messages  {entry['checker']}")
+            
+            for file, seconds in entry["files"][:3]:
+                print(f" {'':>24}{seconds:8.3f}s  {file}")
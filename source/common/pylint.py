@@ -1,15 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import sys
 import json
+import configparser
+import time
+import subprocess
 import math
 import copy
 import itertools
 
-from typing import List, Dict
+from array import array
+from typing import List, Dict, Set
+from collections import Counter
 from functools import reduce
 
 from .util import util
+from .classify import BlameClassifier
+from .profiling import CheckerProfile
 # from .git import GitBlame
 
 
@@ -18,9 +27,10 @@ from .util import util
         
 class LintIssue:
     
-    def __init__(self, issue: Dict[str, str], blame):
+    def __init__(self, issue: Dict[str, str], blame, new: bool = True):
         
         self.blame = blame
+        self.raw = issue
         
         self.path = issue["path"]
         self.line = issue["line"]
@@ -35,7 +45,7 @@ class LintIssue:
         self.key = f'{self.line}:{self.column}:{self.type}:{self.symbol}:{self.message}'
         self.hash = f"{self.path}:{self.message_id}"
     
-        self.new = True
+        self.new = new
     
         self.print = []
         left_chop = 0
@@ -56,10 +66,10 @@ class LintIssue:
         
 class LintCounter:
     
-    def __init__(self):
+    def __init__(self, new: int = 0, old: int = 0):
         
-        self.new = 0
-        self.old = 0
+        self.new = new
+        self.old = old
         
     def increment(self, new: bool):
         
@@ -86,17 +96,39 @@ class LintCategories:
         self.warnings = LintCounter()
         self.errors = LintCounter()
         self.totals = LintCounter()
-    
-    def update(self, issue: LintIssue):
         
-        if issue.type == "warning":
-            self.warnings.increment(issue.new)
-        elif issue.type == "errors":
-            self.errors.increment(issue.new)
-        else:
-            return
+    @staticmethod
+    def from_tally(tally: Counter, types):
+        
+        """ Lint Categories: From Tally
+
+        Args:
+            tally (Counter): Issue counts keyed by (type index, new flag).
+            types (LintStrings): The interned type table that the type indexes refer to.
+
+        Returns:
+            LintCategories: The warning, error & total counts for the tally.
+
+        """
+        
+        counts = LintCategories()
+        
+        for (type, new), count in tally.items():
             
-        self.totals.increment(issue.new)
+            if types[type] == "warning":
+                counter = counts.warnings
+            elif types[type] == "error":
+                counter = counts.errors
+            else:
+                continue
+                
+            for counter in [counter, counts.totals]:
+                if new:
+                    counter.new += count
+                else:
+                    counter.old += count
+            
+        return counts
         
     def __add__(self, other):
         
@@ -108,11 +140,11 @@ class LintCategories:
             
 class LintMaximums:
     
-    def __init__(self):
+    def __init__(self, line: int = 0, column: int = 0, message_id: int = 0):
         
-        self.line = 0
-        self.column = 0
-        self.message_id = 0
+        self.line = line
+        self.column = column
+        self.message_id = message_id
         
     def __add__(self, other):
         
@@ -125,57 +157,284 @@ class LintMaximums:
     def length(self, number: int) -> int:
         
         return math.floor(math.log10(number) + 1) if number > 0 else len(str(number))
+        
+    @staticmethod
+    def from_columns(lines, columns, message_ids: List[str]):
+        
+        # The widest number is always the largest one, so only the maximum needs measuring
+        maximums = LintMaximums()
+        
+        if len(lines) == 0:
+            return maximums
+        
+        maximums.line = maximums.length(max(lines))
+        maximums.column = maximums.length(max(columns))
+        maximums.message_id = max(map(len, message_ids))
+        
+        return maximums
+        
+class LintStrings:
+    
+    """ Lint Strings: An interning table that maps repeated strings onto integer ids """
     
-    def update(self, issue: LintIssue):
+    def __init__(self, values: List[str] = ()):
+        
+        self.values = []
+        self.lookup = {}
+        
+        for value in values:
+            self.intern(value)
+            
+    def intern(self, value: str) -> int:
+        
+        index = self.lookup.get(value)
+        
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self.lookup[value] = index
+            
+        return index
         
-        self.line = max(self.line, self.length(issue.line))
-        self.column = max(self.column, self.length(issue.column))
-        self.message_id = max(self.message_id, len(issue.message_id))      
+    def __getitem__(self, index: int) -> str:
+        return self.values[index]
+        
+    def __len__(self) -> int:
+        return len(self.values)
+        
+class LintBlame:
+    
+    """ Lint Blame: The part of a git blame that a stored report keeps for each issue """
+    
+    def __init__(self, author: str, new: bool):
+        
+        self.author = author
+        self.new = new
     
 class LintFile:
     
-    def __init__(self, path, blame):
+    def __init__(self, report, path: str, blame):
         
+        self.report = report
         self.path = path
         self.blame = blame
-        self.counts = LintCategories()
-        self.maximums = LintMaximums()
-        self.lints = {}
+        
+        # Row numbers of this file's issues within the report columns
+        self.rows = array("i")
         self.keys = set()
+        
+    def key(self, issue: Dict[str, str]) -> tuple:
+        
+        # JSON output appears to have duplicate warnings
+        # This key prevents those duplications from being processed
+        strings = self.report.strings
+        return (issue["line"], issue["column"], strings["type"].intern(issue["type"]), strings["symbol"].intern(issue["symbol"]), strings["message"].intern(issue["message"]))
     
-    def is_duplicate(self, issue: LintIssue) -> bool:
+    def is_duplicate(self, issue: Dict[str, str]) -> bool:
         
-        return issue.key in self.keys
+        return self.key(issue = issue) in self.keys
     
-    def append(self, issue: LintIssue):
+    def append(self, issue: Dict[str, str], new: bool = True):
         
-        self.maximums.update(issue)
-        self.counts.update(issue)
+        self.keys.add(self.key(issue = issue))
+        self.rows.append(self.report.append(issue = issue, new = new))
         
-        self.keys.add(issue.key)
+    def close(self):
         
-        if issue.hash not in self.lints:
-            self.lints[issue.hash] = []
-    
-        self.lints[issue.hash].append(issue)
+        # Duplicate keys are only needed while pylint output for the file is being appended
+        self.keys = set()
+        
+    def reopen(self):
+        
+        # Rebuild the duplicate keys from the stored rows so that more issues can be appended
+        columns = self.report.columns
+        self.keys = set(map(lambda a: (columns["line"][a], columns["column"][a], columns["type"][a], columns["symbol"][a], columns["message"][a]), self.rows))
+        
+    def column(self, name: str) -> List[int]:
+        
+        column = self.report.columns[name]
+        return [column[row] for row in self.rows]
+        
+    @property
+    def counts(self) -> LintCategories:
+        
+        return LintCategories.from_tally(tally = Counter(zip(self.column("type"), self.column("new"))), types = self.report.strings["type"])
+        
+    @property
+    def maximums(self) -> LintMaximums:
+        
+        message_ids = self.report.strings["message_id"]
+        
+        return LintMaximums.from_columns(
+            lines = self.column("line"), 
+            columns = self.column("column"), 
+            message_ids = list(map(lambda a: message_ids[a], set(self.column("message_id"))))
+        )
+        
+    @property
+    def lints(self) -> Dict[str, List[LintIssue]]:
+        
+        # Issue objects are only materialised when a consumer needs them
+        lints = {}
+        
+        for row in self.rows:
+            
+            issue = self.report.issue(row = row, blame = self.blame)
+            
+            if issue.hash not in lints:
+                lints[issue.hash] = []
+                
+            lints[issue.hash].append(issue)
+            
+        return lints
 
 class LintReport:
     
+    # Integer columns stored per issue, with the string table each one indexes into (if any)
+    schema = {
+        "path": ("i", "path"),
+        "line": ("i", None),
+        "column": ("i", None),
+        "type": ("b", "type"),
+        "symbol": ("i", "symbol"),
+        "message_id": ("i", "message_id"),
+        "message": ("i", "message"),
+        "new": ("b", None)
+    }
+    
     def __init__(self):
 
         self.reports = {}
-        self.counts = LintCategories()
-        self.maximums = LintMaximums()
         
-    def __setitem__(self, path, report):
+        # Paths that were linted when only part of the repository was, None when the report is complete
+        self.linted = None
+        
+        self.strings = {
+            "path": LintStrings(),
+            "type": LintStrings(["fatal", "error", "warning", "refactor", "convention", "info"]),
+            "symbol": LintStrings(),
+            "message_id": LintStrings(),
+            "message": LintStrings()
+        }
         
-        self.counts += report.counts
-        self.maximums += report.maximums
+        self.columns = dict(map(lambda a: (a[0], array(a[1][0])), self.schema.items()))
         
-        self.reports[path] = report
+    def file(self, path: str, blame) -> LintFile:
+        
+        if path not in self.reports:
+            self.reports[path] = LintFile(report = self, path = path, blame = blame)
+            
+        return self.reports[path]
+        
+    def append(self, issue: Dict[str, str], new: bool) -> int:
+        
+        row = len(self)
+        
+        for name, (code, table) in self.schema.items():
+            
+            if name == "new":
+                value = int(new)
+            elif table is None:
+                value = issue[name]
+            else:
+                value = self.strings[table].intern(issue[name.replace("_", "-")])
+                
+            self.columns[name].append(value)
+            
+        return row
+        
+    def issue(self, row: int, blame = None) -> LintIssue:
+        
+        columns = self.columns
+        strings = self.strings
+        line = columns["line"][row]
+        
+        return LintIssue(
+            issue = {
+                "path": strings["path"][columns["path"][row]],
+                "line": line,
+                "column": columns["column"][row],
+                "symbol": strings["symbol"][columns["symbol"][row]],
+                "message": strings["message"][columns["message"][row]],
+                "message-id": strings["message_id"][columns["message_id"][row]],
+                "type": strings["type"][columns["type"][row]]
+            },
+            blame = blame[line - 1] if blame is not None else None,
+            new = bool(columns["new"][row])
+        )
+        
+    def __len__(self) -> int:
+        return len(self.columns["line"])
         
     def __getitem__(self, path):
         return self.reports[path]
+        
+    @property
+    def partial(self) -> bool:
+        return self.linted is not None
+        
+    def covers(self, path: str) -> bool:
+        
+        # Issues for files that were never linted must be left alone, rather than treated as fixed
+        return self.linted is None or path in self.linted
+        
+    @property
+    def counts(self) -> LintCategories:
+        
+        return LintCategories.from_tally(tally = Counter(zip(self.columns["type"], self.columns["new"])), types = self.strings["type"])
+        
+    @property
+    def maximums(self) -> LintMaximums:
+        
+        return LintMaximums.from_columns(lines = self.columns["line"], columns = self.columns["column"], message_ids = self.strings["message_id"].values)
+        
+    def group(self, by: str) -> Dict[str, int]:
+        
+        """ Lint Report: Group
+
+        Args:
+            by (str): The name of an interned column, e.g. "path", "type" or "message_id".
+
+        Returns:
+            Dict[str, int]: The number of issues for each distinct value of the column.
+
+        """
+        
+        table = self.strings[self.schema[by][1]]
+        return dict(map(lambda a: (table[a[0]], a[1]), Counter(self.columns[by]).items()))
+        
+    @property
+    def hashes(self) -> Set[str]:
+        
+        paths = self.strings["path"]
+        message_ids = self.strings["message_id"]
+        
+        return set(map(lambda a: f"{paths[a[0]]}:{message_ids[a[1]]}", set(zip(self.columns["path"], self.columns["message_id"]))))
+        
+    def merge(self, other):
+        
+        # Rows are re-interned into this report's tables, so reports from different runs can be combined
+        if other.linted is not None:
+            self.linted = (self.linted or set()) | other.linted
+        
+        for path, other_file in other.reports.items():
+            
+            file = self.file(path = path, blame = {})
+            file.reopen()
+            
+            for row in other_file.rows:
+                
+                issue = other.issue(row = row, blame = other_file.blame)
+                
+                if file.is_duplicate(issue.raw):
+                    continue
+                
+                file.append(issue.raw, new = issue.new)
+                file.blame[issue.line - 1] = issue.blame
+                
+            file.close()
+            
+        return self
 
 
         
@@ -183,7 +442,7 @@ class LintReport:
     
 class Linter:
     
-    def __init__(self, rcfile = "/source/config/.pylintrc"):
+    def __init__(self, rcfile = "/source/config/.pylintrc", overrides: Dict[str, str] = None):
     
         self.categories = {
             "warning": "⚠️ Warnings",
@@ -198,55 +457,139 @@ class Linter:
             "rcfile": rcfile
         }
         
+        # Command line options after the rcfile take precedence over it
+        pylint_arguments.update(overrides or {})
+        
         self.arguments = " ".join(list(map(
             lambda a: 
             f"--{a[0]}" + (f"={a[1]}" if a[1] != "" else ""), 
             pylint_arguments.items()
         )))
 
-    def lint(self, git) -> LintReport:
+    @staticmethod
+    def overlay(path: str) -> Dict[str, str]:
         
-        report = LintReport()
-        files = " ".join(list(map(lambda file: file.replace(" ", "\ "), util.files())))
+        # Pylint has no rcfile includes, so an overlay's message control options are passed as overrides instead
+        parser = configparser.ConfigParser()
+        parser.read(path)
+        
+        if not parser.has_section("MESSAGES CONTROL"):
+            return {}
+        
+        return dict(map(lambda a: (a[0], "".join(a[1].split())), parser.items("MESSAGES CONTROL")))
 
-        for path, issues in itertools.groupby(json.loads(util.exec(f"pylint {self.arguments} {files}")), key = lambda a: a["path"]):
+    @staticmethod
+    def fast(rcfile = "/source/config/.pylintrc", overrides: Dict[str, str] = None):
+        
+        # Only the error & fatal checkers, which are all that decide whether the build is blocked. The other categories are
+        # disabled on top of the rcfile & any overlay, so errors they turn off (e.g. import-error) stay off like in the full pass
+        overrides = dict(overrides or {})
+        overrides["disable"] = ",".join(filter(None, ["C,R,W,I", overrides.get("disable")]))
+        
+        return Linter(rcfile = rcfile, overrides = overrides)
 
-            blame = git.blame(path = path)
-            file = LintFile(path = path, blame = blame)
+    def lint(self, git, shard: int = 0, shards: int = 1, classifier = None, paths: List[str] = None, scheduler = None) -> LintReport:
+        
+        # Decides which issues are new, the default attributes each issue line with git blame
+        if classifier is None:
+            classifier = BlameClassifier(git = git)
+        
+        report = LintReport()
+        files = util.shard(paths = util.files(root = git.root) if paths is None else paths, index = shard, count = shards)
         
-            for issue in (LintIssue(issue = raw, blame = blame[raw["line"] - 1]) for raw in issues):
+        if scheduler is None:
+            
+            if len(files) > 0:
+                self.collect(report = report, classifier = classifier, issues = json.loads(util.exec(f"pylint {self.arguments} {self.escape(files)}", cwd = git.root)))
                 
-                if file.is_duplicate(issue):  
-                    continue
+            # A shard only covers its own files, so a merge of missing shards never treats the rest as fixed
+            if shards > 1:
+                report.linted = set(files)
                 
-                file.append(issue)
+            return report
         
-            report[path] = file
+        # With a time budget, files are linted in priority order & batches until the budget runs out
+        report.linted = set()
+        
+        for batch in scheduler.batches(paths = files):
+            
+            start = time.monotonic()
+            
+            try:
+                output = util.exec(f"pylint {self.arguments} {self.escape(batch)}", timeout = scheduler.remaining, cwd = git.root)
+            except subprocess.TimeoutExpired:
+                break
+                
+            scheduler.record(paths = batch, seconds = time.monotonic() - start)
+            
+            self.collect(report = report, classifier = classifier, issues = json.loads(output))
+            report.linted.update(batch)
+            
+        if len(report.linted) < len(files):
+            print(f"Time budget reached after linting {len(report.linted)} of {len(files)} files")
+        elif shards == 1:
+            # Every file was reached, so the report is as complete as an unscheduled one
+            report.linted = None
         
         return report
+        
+    def profile(self, paths: List[str] = None, output: str = "/tmp/autolint-profile.json") -> CheckerProfile:
+        
+        files = util.files() if paths is None else paths
+        source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        # A single job keeps every checker in this process, so the plugin sees all of the work
+        command = f"PYTHONPATH={source} AUTOLINT_PROFILE={output} pylint {self.arguments} --jobs=1 --load-plugins=common.profiling {self.escape(files)}"
+        issues = json.loads(util.exec(command)) if len(files) > 0 else []
+        
+        return CheckerProfile.load(path = output, issues = issues)
+        
+    def escape(self, files: List[str]) -> str:
+        
+        return " ".join(list(map(lambda file: file.replace(" ", "\\ "), files)))
+        
+    def collect(self, report: LintReport, classifier, issues: List[Dict[str, any]]):
+
+        for path, issues in itertools.groupby(issues, key = lambda a: a["path"]):
+
+            blame = classifier.blame(path = path)
+            file = report.file(path = path, blame = blame)
+        
+            for raw in issues:
+                
+                if file.is_duplicate(raw):  
+                    continue
+                
+                file.append(raw, new = classifier.new(path = path, issue = raw, blame = blame))
+                
+            file.close()
     
-    def terminal(self, report: LintReport):
+    def terminal(self, report: LintReport, output = None):
+        
+        output = output or sys.stdout
         
         indent = " " * (report.maximums.line + 1 + report.maximums.column + 3 + 2 + report.maximums.message_id + 2)
         
         for path, file_report in report.reports.items():
         
-            print("")
-            print("")
-            print(f" *** {path} ***")
-            print("")
+            maximums = file_report.maximums
+        
+            print("", file = output)
+            print("", file = output)
+            print(f" *** {path} ***", file = output)
+            print("", file = output)
 
             for hash, lints in file_report.lints.items():
                 
                 for issue in lints:
 
-                    line_indent = " " * (file_report.maximums.line - file_report.maximums.length(issue.line))
-                    column_indent = " " * (file_report.maximums.column - file_report.maximums.length(issue.column))
-                    id_indent = " " * (file_report.maximums.message_id - len(issue.message_id))
+                    line_indent = " " * (maximums.line - maximums.length(issue.line))
+                    column_indent = " " * (maximums.column - maximums.length(issue.column))
+                    id_indent = " " * (maximums.message_id - len(issue.message_id))
 
                     for index, line in enumerate(issue.print):
 
                         if index == 0:
-                            print(line.format(line_indent, column_indent, id_indent))
+                            print(line.format(line_indent, column_indent, id_indent), file = output)
                         else:
-                            print(line.format(indent))
+                            print(line.format(indent), file = output)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import base64
+
+from typing import List, Dict, Iterable, Iterator
+
+from .pylint import LintReport
+
+
+class Base64Stream:
+    
+    """ Base64 Stream: A write-only file object that base64 encodes everything written through it """
+    
+    def __init__(self, output):
+        
+        self.output = output
+        self.remainder = b""
+        
+    def write(self, data: bytes) -> int:
+        
+        data = self.remainder + bytes(data)
+        
+        # Only whole 3 byte groups can be encoded without padding
+        cut = len(data) - len(data) % 3
+        self.output.write(base64.b64encode(data[:cut]))
+        self.remainder = data[cut:]
+        
+        return len(data) - len(self.remainder)
+        
+    def flush(self):
+        
+        self.output.flush()
+        
+    def close(self):
+        
+        self.output.write(base64.b64encode(self.remainder))
+        self.remainder = b""
+        self.output.flush()
+
+
+class SarifWriter:
+    
+    """ Sarif Writer: Streams pylint issues into a SARIF 2.1.0 log without holding the results in memory """
+    
+    levels = {
+        "fatal": "error",
+        "error": "error",
+        "warning": "warning"
+    }
+    
+    def __init__(self, path: str, encode: bool = True):
+        
+        self.file = open(path, "wb")
+        
+        # Code scanning uploads expect the log gzipped & then base64 encoded
+        if encode:
+            self.base64 = Base64Stream(output = self.file)
+            self.output = gzip.GzipFile(fileobj = self.base64, mode = "wb")
+        else:
+            self.base64 = None
+            self.output = self.file
+        
+        # Rules are deduplicated by message id, and are the only thing that grows with the report
+        self.rules = {}
+        self.results = 0
+        
+        # Object keys are unordered, so results are written first and the tool & rules once they are all known
+        self.output.write(b'{"version": "2.1.0", "$schema": "https://json.schemastore.org/sarif-2.1.0.json", "runs": [{"results": [')
+        
+    def rule(self, issue: Dict[str, any]) -> int:
+        
+        message_id = issue["message-id"]
+        
+        if message_id not in self.rules:
+            self.rules[message_id] = (len(self.rules), {
+                "id": message_id,
+                "name": issue["symbol"],
+                "shortDescription": {"text": issue["symbol"].replace("-", " ").capitalize()},
+                "defaultConfiguration": {"level": self.levels.get(issue["type"], "note")},
+                "properties": {"tags": [issue["type"]]}
+            })
+            
+        return self.rules[message_id][0]
+        
+    def write(self, issue: Dict[str, any]):
+        
+        result = {
+            "ruleId": issue["message-id"],
+            "ruleIndex": self.rule(issue = issue),
+            "level": self.levels.get(issue["type"], "note"),
+            "message": {"text": issue["message"]},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": issue["path"]},
+                    "region": {"startLine": max(issue["line"], 1), "startColumn": issue["column"] + 1}
+                }
+            }]
+        }
+        
+        self.output.write((", " if self.results > 0 else "").encode("utf-8") + json.dumps(result).encode("utf-8"))
+        self.results += 1
+        
+    def write_issues(self, issues: Iterable[Dict[str, any]]):
+        
+        # Any stream of pylint JSON issues, e.g. straight from the pylint output
+        for issue in issues:
+            self.write(issue = issue)
+        
+    def write_report(self, report: LintReport):
+        
+        for file_report in report.reports.values():
+            for row in file_report.rows:
+                self.write(issue = report.issue(row = row).raw)
+        
+    def close(self):
+        
+        rules = list(map(lambda a: a[1], sorted(self.rules.values(), key = lambda a: a[0])))
+        tool = {"driver": {"name": "pylint", "informationUri": "https://pylint.pycqa.org", "rules": rules}}
+        
+        self.output.write(b'], "tool": ' + json.dumps(tool).encode("utf-8") + b"}]}")
+        self.output.close()
+        
+        if self.base64 is not None:
+            self.base64.close()
+            
+        self.file.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *args):
+        self.close()
+        
+        
+class SarifPublisher:
+    
+    """ Sarif Publisher: Uploads a LintReport to code scanning as one gzip+base64 SARIF log """
+    
+    def __init__(self, git, path: str = "/tmp/autolint.sarif"):
+        
+        # Uploads go through Git.request for its session, rate limit retries & call counting
+        self.git = git
+        self.headers = {"Accept": "application/vnd.github+json", "Content-Type": "application/json"}
+        self.sha = git.after
+        self.branch = git.branch
+        self.path = path
+        
+    def body(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        
+        # The request body is streamed so the encoded log is never read into memory in one piece
+        yield json.dumps({"commit_sha": self.sha, "ref": f"refs/heads/{self.branch}"})[:-1].encode("utf-8") + b', "sarif": "'
+        
+        with open(self.path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                yield chunk
+                
+        yield b'"}'
+        
+    def __iter__(self) -> Iterator[bytes]:
+        
+        # Passed as the request data so that every retry streams a fresh body, a generator could only be sent once
+        return self.body()
+        
+    def publish(self, report: LintReport) -> int:
+        
+        with SarifWriter(path = self.path) as writer:
+            writer.write_report(report = report)
+            
+        response = self.git.request("POST", f"/repos/{self.git.repo}/code-scanning/sarifs", headers = self.headers, data = self)
+        
+        # Error pages (e.g. 413 or a 502 from a proxy) are not JSON, so the status is checked before the body is read
+        response.raise_for_status()
+        
+        print(response)
+        print(response.json())
+        
+        # Matches Git.sync_issues, which returns one per open lint group
+        return len(report.hashes)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+
+from typing import List, Dict, Set, Iterator
+
+
+class FileCosts:
+    
+    """ File Costs: Persistent estimates of how many seconds pylint spends on each file """
+    
+    def __init__(self, path: str = None, default: float = 0.5):
+        
+        self.path = path
+        self.default = default
+        self.costs: Dict[str, float] = {}
+        
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path) as file:
+                self.costs = json.load(file)
+                
+    def estimate(self, path: str) -> float:
+        
+        if path in self.costs:
+            return self.costs[path]
+            
+        # Files that have never been linted are assumed to cost the same as an average file
+        return sum(self.costs.values()) / len(self.costs) if len(self.costs) > 0 else self.default
+        
+    def record(self, paths: List[str], seconds: float):
+        
+        # A batch is only timed as a whole, so its time is split between the files by size
+        sizes = dict(map(lambda a: (a, max(os.path.getsize(a), 1) if os.path.exists(a) else 1), paths))
+        total = sum(sizes.values())
+        
+        for path, size in sizes.items():
+            self.costs[path] = seconds * size / total
+            
+    def save(self):
+        
+        if self.path is None:
+            return
+            
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok = True)
+        
+        with open(self.path, "w") as file:
+            json.dump(self.costs, file)
+            
+
+class Scheduler:
+    
+    """ Scheduler: Orders files by priority & cost, and hands them out in batches that fit a time budget """
+    
+    def __init__(self, budget: float, costs: FileCosts, changed: List[str] = (), open: List[str] = (), chunk: float = 30, clock = time.monotonic):
+        
+        self.costs = costs
+        self.changed = set(changed)
+        self.open = set(open)
+        self.chunk = chunk
+        self.clock = clock
+        self.deadline = self.clock() + budget
+        
+    @property
+    def remaining(self) -> float:
+        return max(self.deadline - self.clock(), 0)
+        
+    def priority(self, path: str) -> tuple:
+        
+        # Changed files first, then files with open autolint issues, then everything else, cheapest first
+        tier = 0 if path in self.changed else 1 if path in self.open else 2
+        return (tier, self.costs.estimate(path = path), path)
+        
+    def order(self, paths: List[str]) -> List[str]:
+        return sorted(paths, key = self.priority)
+        
+    def batches(self, paths: List[str]) -> Iterator[List[str]]:
+        
+        """ Scheduler: Batches
+
+        Args:
+            paths (List[str]): Every file that should be linted.
+
+        Yields:
+            List[str]: The next batch of files, sized so its estimated cost fits the remaining budget.
+                Stops once not even the next file is expected to finish in time.
+
+        """
+        
+        queue = self.order(paths = paths)
+        
+        while len(queue) > 0:
+            
+            limit = min(self.chunk, self.remaining)
+            batch = []
+            estimate = 0
+            
+            for path in queue:
+                
+                cost = self.costs.estimate(path = path)
+                
+                if len(batch) > 0 and estimate + cost > limit:
+                    break
+                    
+                batch.append(path)
+                estimate += cost
+                
+            if estimate > self.remaining:
+                return
+                
+            queue = queue[len(batch):]
+            
+            yield batch
+            
+    def record(self, paths: List[str], seconds: float):
+        
+        self.costs.record(paths = paths, seconds = seconds)
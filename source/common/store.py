@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import mmap
+import struct
+
+from typing import List, Dict, Iterator, Union
+from collections import Counter
+
+from .pylint import LintReport, LintBlame
+
+# Report file layout (all integers little endian):
+#
+#   header   magic, version, string count, row count, file count, string offsets offset, file index offset,
+#            linted paths offset & count (-1 when the report is complete)
+#   rows     fixed width issue rows, grouped so that each file's rows are contiguous
+#   strings  u32 length prefixed UTF-8 strings
+#   offsets  u64 absolute offset of each string, so any string can be read without scanning
+#   index    path string id, first row & row count for every file
+#   linted   u32 path string ids of every linted file, for reports cut short by a time budget
+
+MAGIC = b"ALNT"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHxxIIIQQQi")
+ROW = struct.Struct("<IIIIIIIIB")
+INDEX = struct.Struct("<IQI")
+LENGTH = struct.Struct("<I")
+LINTED = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+
+# Row columns in the order they are packed, the last one is the new flag
+FIELDS = ["path", "line", "column", "type", "symbol", "message-id", "message", "author"]
+STRINGS = ["path", "type", "symbol", "message-id", "message", "author"]
+
+# String id used for a missing (None) author
+MISSING = 0xFFFFFFFF
+
+
+class ReportFormatError(Exception):
+    
+    """ Report Format Error: Raised when a file is not a report written by ReportWriter """
+    
+    pass
+
+
+# Writing
+
+class ReportWriter:
+    
+    def __init__(self, path: str):
+        
+        self.path = path
+        self.output = open(path, "wb")
+        
+        self.strings = {}
+        self.files = {}
+        self.order = []
+        self.current = None
+        self.rows = 0
+        self.linted = None
+        
+        # The header is rewritten with the real counts & offsets once the report is closed
+        self.output.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0, 0, 0, -1))
+        
+    def intern(self, value: Union[str, None]) -> int:
+        
+        if value is None:
+            return MISSING
+            
+        if value not in self.strings:
+            self.strings[value] = len(self.strings)
+            
+        return self.strings[value]
+        
+    def write(self, issue: Dict[str, any], author: str = None, new: bool = True):
+        
+        path = issue["path"]
+        
+        if path != self.current:
+            
+            if path in self.files:
+                raise ValueError(f"Issues for {path} must be written contiguously")
+                
+            self.files[path] = [self.rows, 0]
+            self.order.append(path)
+            self.current = path
+        
+        values = dict(issue, author = author)
+        
+        self.output.write(ROW.pack(*[
+            self.intern(values[field]) if field in STRINGS else values[field] 
+            for field in FIELDS
+        ], int(new)))
+        
+        self.files[path][1] += 1
+        self.rows += 1
+        
+    def write_report(self, report: LintReport):
+        
+        if report.linted is not None:
+            self.linted = sorted(report.linted)
+        
+        for path, file_report in report.reports.items():
+            for row in file_report.rows:
+                
+                issue = report.issue(row = row, blame = file_report.blame)
+                self.write(issue = issue.raw, author = issue.blame.author if issue.blame is not None else None, new = issue.new)
+                
+    def close(self):
+        
+        # Linted paths must be interned before the string table is written
+        linted = list(map(self.intern, self.linted)) if self.linted is not None else None
+        offsets = []
+        
+        for value in self.strings.keys():
+            
+            encoded = value.encode("utf-8")
+            offsets.append(self.output.tell())
+            self.output.write(LENGTH.pack(len(encoded)) + encoded)
+            
+        offsets_offset = self.output.tell()
+        
+        for offset in offsets:
+            self.output.write(OFFSET.pack(offset))
+            
+        index_offset = self.output.tell()
+        
+        for path in self.order:
+            self.output.write(INDEX.pack(self.strings[path], *self.files[path]))
+            
+        linted_offset = self.output.tell()
+        
+        for path in (linted or []):
+            self.output.write(LINTED.pack(path))
+            
+        self.output.seek(0)
+        self.output.write(HEADER.pack(MAGIC, VERSION, len(self.strings), self.rows, len(self.order), offsets_offset, index_offset, linted_offset, len(linted) if linted is not None else -1))
+        self.output.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *args):
+        self.close()
+        
+        
+# Reading
+        
+class ReportReader:
+    
+    def __init__(self, path: str):
+        
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        
+        magic, version, self.string_count, self.row_count, file_count, self.offsets, index, linted, linted_count = HEADER.unpack_from(self.data, 0)
+        
+        if magic != MAGIC or version != VERSION:
+            raise ReportFormatError(f"{path} is not a version {VERSION} autolint report")
+        
+        self.strings = {}
+        
+        # The file index is small, so it is the only part that is read up front
+        self.index = {}
+        
+        for position in range(file_count):
+            path_id, first, count = INDEX.unpack_from(self.data, index + position * INDEX.size)
+            self.index[self.string(path_id)] = (first, count)
+            
+        self.linted = None
+        
+        if linted_count >= 0:
+            self.linted = set(map(lambda a: self.string(LINTED.unpack_from(self.data, linted + a * LINTED.size)[0]), range(linted_count)))
+            
+    def string(self, index: int) -> Union[str, None]:
+        
+        if index == MISSING:
+            return None
+        
+        if index not in self.strings:
+            offset, = OFFSET.unpack_from(self.data, self.offsets + index * OFFSET.size)
+            length, = LENGTH.unpack_from(self.data, offset)
+            self.strings[index] = self.data[offset + LENGTH.size:offset + LENGTH.size + length].decode("utf-8")
+            
+        return self.strings[index]
+        
+    @property
+    def paths(self) -> List[str]:
+        return list(self.index.keys())
+        
+    def __len__(self) -> int:
+        return self.row_count
+        
+    def rows(self, first: int, count: int) -> Iterator[Dict[str, any]]:
+        
+        for row in range(first, first + count):
+            
+            values = ROW.unpack_from(self.data, HEADER.size + row * ROW.size)
+            issue = dict(map(lambda a: (a[0], self.string(a[1]) if a[0] in STRINGS else a[1]), zip(FIELDS, values)))
+            issue["new"] = bool(values[-1])
+            
+            yield issue
+        
+    def issues(self, path: str = None) -> Iterator[Dict[str, any]]:
+        
+        # Only the rows of the requested file are touched in the mapped report
+        if path is None:
+            return self.rows(first = 0, count = self.row_count)
+        
+        if path not in self.index:
+            return iter([])
+            
+        return self.rows(*self.index[path])
+        
+    def report(self, paths: List[str] = None) -> LintReport:
+        
+        report = LintReport()
+        report.linted = set(self.linted) if self.linted is not None else None
+        
+        for path in (paths if paths is not None else self.paths):
+            
+            file = report.file(path = path, blame = {})
+            
+            for issue in self.issues(path = path):
+                file.append(issue, new = issue["new"])
+                
+                # Issues that were never blamed (e.g. diff classification) stay unblamed, so their remote assignees are kept
+                file.blame[issue["line"] - 1] = LintBlame(author = issue["author"], new = issue["new"]) if issue["author"] is not None else None
+                
+            file.close()
+            
+        return report
+        
+    def close(self):
+        
+        self.data.close()
+        self.file.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *args):
+        self.close()
+        
+
+# Utilities
+
+def save(report: LintReport, path: str):
+    
+    with ReportWriter(path = path) as writer:
+        writer.write_report(report = report)
+        
+def load(path: str) -> LintReport:
+    
+    with ReportReader(path = path) as reader:
+        return reader.report()
+        
+def merge(paths: List[str]) -> LintReport:
+    
+    report = LintReport()
+    
+    for path in paths:
+        report.merge(load(path = path))
+        
+    return report
+        
+def diff(before: ReportReader, after: ReportReader) -> Dict[str, Dict[str, List[Dict[str, any]]]]:
+    
+    """ Diff: Compare two stored reports file by file
+
+    Args:
+        before (ReportReader): The older report.
+        after (ReportReader): The newer report.
+
+    Returns:
+        Dict[str, Dict[str, List[Dict[str, any]]]]: The added & removed issues for every file that changed.
+            Issues are matched on their type, symbol & message so that lines shifting does not count as a change.
+
+    """
+    
+    key = lambda a: (a["type"], a["symbol"], a["message-id"], a["message"])
+    changes = {}
+    
+    for path in set(before.paths) | set(after.paths):
+        
+        old = list(before.issues(path = path))
+        new = list(after.issues(path = path))
+        
+        removed = Counter(map(key, old)) - Counter(map(key, new))
+        added = Counter(map(key, new)) - Counter(map(key, old))
+        
+        if len(removed) == 0 and len(added) == 0:
+            continue
+            
+        changes[path] = {"added": pick(issues = new, counts = added, key = key), "removed": pick(issues = old, counts = removed, key = key)}
+        
+    return changes
+    
+def pick(issues: List[Dict[str, any]], counts: Counter, key) -> List[Dict[str, any]]:
+    
+    picked = []
+    
+    for issue in issues:
+        if counts[key(issue)] > 0:
+            counts[key(issue)] -= 1
+            picked.append(issue)
+            
+    return picked
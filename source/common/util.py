@@ -1,30 +1,69 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import signal
+import hashlib
 import subprocess
 
-from typing import List, Union
+from typing import List, Dict, Union
 
 
 class util:
     
+    # Set by GitHub Actions (including Enterprise Server), and can point at a local fake API for testing
+    github_api = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+    
+    # Discovered python files for each working copy, shared by everything linting it in this process
+    discovered: Dict[str, List[str]] = {}
+    
     @staticmethod
-    def exec(command) -> str:
+    def exec(command, timeout: float = None, cwd: str = None) -> str:
+        
+        # A new session lets the whole process group (e.g. pylint's worker processes) be killed on timeout
+        run = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True, cwd=cwd)
         
-        run = subprocess.run(command, shell=True, capture_output=True)
+        try:
+            stdout, stderr = run.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(run.pid, signal.SIGKILL)
+            run.communicate()
+            raise
         
-        if run.stderr == b"":
-            return run.stdout.decode("utf-8")
+        if stderr == b"":
+            return stdout.decode("utf-8")
         else:
             print("Execution Error")
             print(f"Input: {command}")
-            print(f"Output: {run.stderr.decode('utf-8')}")
-            return run.stderr.decode("utf-8")
+            print(f"Output: {stderr.decode('utf-8')}")
+            return stderr.decode("utf-8")
     
     @staticmethod
-    def files() -> List[str]:
+    def files(root: str = None) -> List[str]:
+        
+        key = os.path.abspath(root or ".")
+        
+        if key not in util.discovered:
+            util.discovered[key] = list(map(lambda b: b[2:], filter(lambda a: a != "", util.exec("find . -type f -name '*.py'", cwd=root).split("\n"))))
+            
+        return util.discovered[key]
+
+    @staticmethod
+    def shard(paths: List[str], index: int, count: int) -> List[str]:
+        
+        # Stable across processes and runners, unlike the salted built-in hash()
+        return list(filter(lambda a: int(hashlib.md5(a.encode("utf-8")).hexdigest(), 16) % count == index, paths))
+
+    @staticmethod
+    def branch_option(spec: str, branch: str, default: str) -> str:
+        
+        # Either a single value, or "branch:value" pairs separated by commas with "*" as the fallback
+        if ":" not in spec:
+            return spec or default
+            
+        options = dict(map(lambda a: tuple(a.strip().split(":", 1)), filter(lambda a: a.strip() != "", spec.split(","))))
         
-        return list(map(lambda b: b[2:], filter(lambda a: a != "", util.exec("find . -type f -name '*.py'").split("\n"))))
+        return options.get(branch, options.get("*", default))
 
     @staticmethod
     def safe_index(array: List[any], value: any, default: Union[int, None] = None) -> Union[int, None]:
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+from collections import Counter
+from flask import Flask, request, jsonify
+
+# Local stand in for the parts of the GitHub REST API that autolint uses
+# Point the client at it with GITHUB_API_URL=http://127.0.0.1:<port>
+
+class FakeGithub:
+    
+    def __init__(self, latency: float = 0, rate_limit: int = None, rate_window: float = 60):
+        
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        
+        self.issues = {}
+        self.collaborators = []
+        self.check_runs = {}
+        self.sarifs = []
+        
+        # Request counts keyed by "METHOD endpoint"
+        self.calls = Counter()
+        self.limited = 0
+        self.used = 0
+        self.reset = time.time() + rate_window
+        self.lock = threading.Lock()
+        
+    def seed_issue(self, title: str, body: str = "", labels: list = (), assignees: list = (), state: str = "open", pull_request: bool = False) -> dict:
+        
+        with self.lock:
+            
+            number = len(self.issues) + 1
+            
+            self.issues[number] = {
+                "number": number,
+                "title": title,
+                "body": body,
+                "labels": list(map(lambda a: {"name": a}, labels)),
+                "assignees": list(map(lambda a: {"login": a}, assignees)),
+                "state": state
+            }
+            
+            if pull_request:
+                self.issues[number]["pull_request"] = {}
+            
+            return self.issues[number]
+        
+    def seed_collaborators(self, logins: list):
+        
+        self.collaborators += list(map(lambda a: {"login": a}, logins))
+        
+    def throttle(self):
+        
+        # Returns a rate limited response once the quota for the current window is used up
+        with self.lock:
+            
+            if time.time() >= self.reset:
+                self.used = 0
+                self.reset = time.time() + self.rate_window
+                
+            if self.rate_limit is None:
+                return None
+                
+            if self.used >= self.rate_limit:
+                
+                self.limited += 1
+                
+                response = jsonify({"message": "API rate limit exceeded"})
+                response.status_code = 403
+                response.headers["X-RateLimit-Limit"] = str(self.rate_limit)
+                response.headers["X-RateLimit-Remaining"] = "0"
+                response.headers["X-RateLimit-Reset"] = str(int(self.reset) + 1)
+                
+                return response
+                
+            self.used += 1
+            
+        return None
+        
+    def page(self, items: list):
+        
+        per_page = int(request.args.get("per_page", 30))
+        page = int(request.args.get("page", 1))
+        
+        return items[(page - 1) * per_page:page * per_page]
+        
+    def update(self, issue: dict, payload: dict):
+        
+        for key in ["title", "body", "state"]:
+            if key in payload:
+                issue[key] = payload[key]
+                
+        if "labels" in payload:
+            issue["labels"] = list(map(lambda a: {"name": a}, payload["labels"]))
+            
+        if "assignees" in payload:
+            issue["assignees"] = list(map(lambda a: {"login": a}, payload["assignees"]))
+        
+    def create_app(self) -> Flask:
+        
+        app = Flask(__name__)
+        app.fake = self
+        
+        @app.before_request
+        def before():
+            
+            self.calls[f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"] += 1
+            
+            if self.latency > 0:
+                time.sleep(self.latency)
+                
+            return self.throttle()
+            
+        @app.route("/repos/<owner>/<repo>/issues", methods = ["GET"])
+        def list_issues(owner, repo):
+            
+            state = request.args.get("state", "open")
+            labels = set(filter(lambda a: a != "", request.args.get("labels", "").split(",")))
+            
+            with self.lock:
+                issues = list(self.issues.values())
+            
+            issues = list(filter(lambda a: state == "all" or a["state"] == state, issues))
+            issues = list(filter(lambda a: labels.issubset(set(map(lambda b: b["name"], a["labels"]))), issues))
+            
+            return jsonify(self.page(items = issues))
+            
+        @app.route("/repos/<owner>/<repo>/issues", methods = ["POST"])
+        def create_issue(owner, repo):
+            
+            payload = request.get_json(force = True)
+            
+            issue = self.seed_issue(
+                title = payload["title"], 
+                body = payload.get("body", ""), 
+                labels = payload.get("labels", []), 
+                assignees = payload.get("assignees", [])
+            )
+            
+            response = jsonify(issue)
+            response.status_code = 201
+            
+            return response
+            
+        @app.route("/repos/<owner>/<repo>/issues/<int:number>", methods = ["GET"])
+        def get_issue(owner, repo, number):
+            
+            if number not in self.issues:
+                return jsonify({"message": "Not Found"}), 404
+                
+            return jsonify(self.issues[number])
+            
+        @app.route("/repos/<owner>/<repo>/issues/<int:number>", methods = ["PATCH"])
+        def update_issue(owner, repo, number):
+            
+            if number not in self.issues:
+                return jsonify({"message": "Not Found"}), 404
+                
+            with self.lock:
+                self.update(issue = self.issues[number], payload = request.get_json(force = True))
+                
+            return jsonify(self.issues[number])
+            
+        @app.route("/repos/<owner>/<repo>/collaborators", methods = ["GET"])
+        def list_collaborators(owner, repo):
+            
+            return jsonify(self.page(items = self.collaborators))
+            
+        @app.route("/repos/<owner>/<repo>/check-runs", methods = ["POST"])
+        def create_check_run(owner, repo):
+            
+            with self.lock:
+                id = len(self.check_runs) + 1
+                self.check_runs[id] = dict(request.get_json(force = True), id = id, annotations = [])
+                
+            response = jsonify(self.check_runs[id])
+            response.status_code = 201
+            
+            return response
+            
+        @app.route("/repos/<owner>/<repo>/check-runs/<int:id>", methods = ["PATCH"])
+        def update_check_run(owner, repo, id):
+            
+            payload = request.get_json(force = True)
+            output = payload.pop("output", {})
+            
+            if len(output.get("annotations", [])) > 50:
+                return jsonify({"message": "Only 50 annotations are allowed per request"}), 422
+            
+            with self.lock:
+                run = self.check_runs[id]
+                run["annotations"] += output.get("annotations", [])
+                run.update(payload)
+                
+            return jsonify(dict(run, annotations = len(run["annotations"])))
+            
+        @app.route("/repos/<owner>/<repo>/code-scanning/sarifs", methods = ["POST"])
+        def upload_sarif(owner, repo):
+            
+            payload = request.get_json(force = True)
+            self.sarifs.append(payload)
+            
+            response = jsonify({"id": str(len(self.sarifs)), "url": f"{request.host_url}sarifs/{len(self.sarifs)}"})
+            response.status_code = 202
+            
+            return response
+            
+        return app
+
+
+if __name__ == "__main__":
+    
+    FakeGithub().create_app().run(port = 5051)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures issue sync throughput & API call counts against the local fake GitHub API
+#
+#   python -m fake.load [--sizes 10,1000,10000] [--latency 0.0] [--rate-limit N]
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.git import Git, GitIssue
+from common.pylint import LintReport
+
+from fake.server import FakeServer
+from fake.github import FakeGithub
+
+repo = "autolint/load"
+branch = "load"
+
+
+def build_report(size: int) -> LintReport:
+    
+    # One lint group per file, so the report produces exactly `size` local issues
+    report = LintReport()
+    
+    for index in range(size):
+        
+        path = f"package/module_{index}.py"
+        file = report.file(path = path, blame = None)
+        file.append({"path": path, "line": 1, "column": 0, "symbol": "undefined-variable", "message": f"Undefined variable 'name_{index}'", "message-id": "E0602", "type": "error"})
+        file.close()
+        
+    return report
+    
+def seed(fake: FakeGithub, git: Git, report: LintReport):
+    
+    local = git.local_issues(report = report)
+    
+    # A realistic mix: a third already match, a third are stale & need updating, and the rest are new
+    # Another third of the size are remote issues for fixed problems that need closing
+    for index, issue in enumerate(local):
+        
+        if index % 3 == 0:
+            fake.seed_issue(title = issue.title, body = issue.body, labels = issue.labels, assignees = issue.assignees or [])
+        elif index % 3 == 1:
+            fake.seed_issue(title = issue.title, body = "stale", labels = issue.labels)
+            
+    for index in range(len(local) // 3):
+        fake.seed_issue(title = f"[E0001] [{branch}] Syntax error error in fixed_{index}.py", labels = ["autolint", "error", "ᚶ feature"])
+        
+    fake.calls.clear()
+    
+def run(size: int, latency: float, rate_limit: int) -> dict:
+    
+    fake = FakeGithub(latency = latency, rate_limit = rate_limit, rate_window = 1)
+    fake.seed_collaborators(logins = list(map(lambda a: f"user{a}", range(150))))
+    
+    with FakeServer(app = fake.create_app()) as server:
+        
+        git = Git(before = None, after = None, repo = repo, token = "load", branch = branch, api = server.url)
+        report = build_report(size = size)
+        
+        seed(fake = fake, git = git, report = report)
+        git.calls = 0
+        
+        # Seeding fills the shared collaborator cache, which would hide the collaborator pages from the sync
+        Git.collaborators.clear()
+        
+        # Sync logs a line per issue, which would dominate the timing
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        
+        try:
+            start = time.perf_counter()
+            count = git.sync_issues(report = report)
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+            
+    return {
+        "size": size,
+        "synced": count,
+        "seconds": elapsed,
+        "issues_per_second": size / elapsed if elapsed > 0 else 0,
+        "client_calls": git.calls,
+        "server_calls": sum(fake.calls.values()),
+        "rate_limited": fake.limited,
+        "by_endpoint": dict(fake.calls)
+    }
+
+
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser(description = "Issue sync load test against a local fake GitHub API")
+    parser.add_argument("--sizes", default = "10,1000,10000")
+    parser.add_argument("--latency", type = float, default = 0)
+    parser.add_argument("--rate-limit", type = int, default = None)
+    arguments = parser.parse_args()
+    
+    # The fake server would otherwise log every request
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    
+    for size in map(int, arguments.sizes.split(",")):
+        
+        result = run(size = size, latency = arguments.latency, rate_limit = arguments.rate_limit)
+        
+        print(f"{result['size']:>6} issues | {result['seconds']:8.2f}s | {result['issues_per_second']:8.1f} issues/s | {result['client_calls']:>6} calls | {result['rate_limited']:>4} rate limited")
+        
+        for endpoint, calls in sorted(result["by_endpoint"].items()):
+            print(f"{'':>8}{calls:>6}  {endpoint}")
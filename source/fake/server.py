@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+
+from werkzeug.serving import make_server
+
+
+class FakeServer:
+    
+    """ Fake Server: Runs a flask app on a background thread so clients can be pointed at it locally """
+    
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        
+        self.app = app
+        self.server = make_server(host, port, app, threaded = True)
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        
+    @property
+    def url(self) -> str:
+        return f"http://{self.server.host}:{self.server.port}"
+        
+    def __enter__(self):
+        
+        self.thread.start()
+        return self
+        
+    def __exit__(self, *args):
+        
+        self.server.shutdown()
+        self.thread.join()
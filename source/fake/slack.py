@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import uuid
+
+from flask import Flask, request, jsonify
+
+# Local stand in for the Slack Web API
+# Point the client at it with SLACK_API_URL=http://127.0.0.1:<port>/api
+
+def create_app(chunk_size: int = 64 * 1024) -> Flask:
+    
+    app = Flask(__name__)
+    
+    # Everything the fake received, for inspection by tests
+    app.state = {"messages": [], "uploads": {}, "completed": []}
+    
+    @app.route("/api/chat.postMessage", methods = ["POST"])
+    def post_message():
+        
+        app.state["messages"].append(request.get_json(force = True))
+        return jsonify({"ok": True})
+    
+    @app.route("/api/files.getUploadURLExternal", methods = ["POST"])
+    def upload_url():
+        
+        file_id = "F" + uuid.uuid4().hex[:10].upper()
+        
+        app.state["uploads"][file_id] = {
+            "filename": request.form["filename"], 
+            "length": int(request.form["length"]), 
+            "received": 0, 
+            "chunks": 0
+        }
+        
+        return jsonify({"ok": True, "file_id": file_id, "upload_url": f"{request.host_url}upload/{file_id}"})
+    
+    @app.route("/upload/<file_id>", methods = ["POST"])
+    def upload(file_id):
+        
+        upload = app.state["uploads"][file_id]
+        
+        # Read the body in chunks, the same way the real endpoint would consume a large upload
+        while True:
+            
+            chunk = request.stream.read(chunk_size)
+            
+            if not chunk:
+                break
+                
+            upload["received"] += len(chunk)
+            upload["chunks"] += 1
+            
+        return "OK - {}".format(upload["received"])
+    
+    @app.route("/api/files.completeUploadExternal", methods = ["POST"])
+    def complete_upload():
+        
+        payload = request.get_json(force = True)
+        
+        for file in payload["files"]:
+            
+            upload = app.state["uploads"].get(file["id"])
+            
+            if upload is None or upload["received"] != upload["length"]:
+                return jsonify({"ok": False, "error": "file_upload_incomplete"})
+                
+        app.state["completed"].append(payload)
+        
+        return jsonify({"ok": True, "files": payload["files"]})
+    
+    return app
+
+
+if __name__ == "__main__":
+    
+    create_app().run(port = 5050)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import requests
+import traceback
+
+from typing import Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from common.pylint import Linter, LintReport
+from common.git import Git
+from common.classify import BlameClassifier, DiffClassifier
+
+from slack import slack, NotificationQueue
+
+# Lints several checked out repositories in one process. The config is a JSON list of
+# {"path": ..., "repo": ..., "before": ..., "after": ..., "branch": ...} entries, one per working copy
+
+with open(os.environ.get("FLEET_CONFIG") or "fleet.json") as file:
+    fleet = json.load(file)
+
+workers = int(os.environ.get("FLEET_WORKERS") or 4)
+cache = os.environ.get("AUTOLINT_CACHE") or None
+
+# Every repository syncs over the same pooled HTTP client, with a connection for each worker
+session = requests.Session()
+adapter = requests.adapters.HTTPAdapter(pool_connections = 1, pool_maxsize = workers)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+# Each repository gets its own pylint run, so modules with the same name in different repositories are never mixed up.
+# The runs share the machine, so pylint's own jobs are split between the workers
+overlay = os.environ.get("AUTOLINT_OVERLAY") or None
+overrides = Linter.overlay(path = overlay) if overlay is not None else {}
+overrides["jobs"] = str(max(1, (os.cpu_count() or 1) // workers))
+linter = Linter(overrides = overrides)
+
+# The worker pool lints, classifies & syncs each repository
+def process(entry: Dict[str, str]) -> Tuple[Git, LintReport]:
+    
+    git = None
+    
+    # One repository failing (a bad SHA, an API error or a pylint crash) must not lose the results of the others
+    try:
+        
+        git = Git(
+            before = entry.get("before"),
+            after = entry.get("after"),
+            repo = entry["repo"],
+            token = entry.get("token") or os.environ.get("REPO_TOKEN"),
+            branch = entry.get("branch"),
+            cache = os.path.join(cache, entry["repo"].replace("/", "-")) if cache is not None else None,
+            root = entry["path"],
+            session = session
+        )
+        
+        if os.environ.get("AUTOLINT_CLASSIFY", "blame") == "diff":
+            classifier = DiffClassifier(git = git)
+        else:
+            classifier = BlameClassifier(git = git)
+
+        report = linter.lint(git = git, classifier = classifier)
+
+        git.save()
+        git.close()
+
+        count = git.sync_issues(report = report)
+
+        print(f"{git.repo}@{git.branch}: {len(report)} issues in {len(report.reports)} files, {count} reports")
+
+        return git, report
+        
+    except Exception:
+        
+        print(f"{entry.get('repo')}@{entry.get('branch')}: failed")
+        traceback.print_exc()
+        
+        if git is not None:
+            git.close()
+        
+        return git, None
+
+with ThreadPoolExecutor(max_workers = workers) as executor:
+    results = list(executor.map(process, fleet))
+
+errors = list(map(lambda a: a[1], filter(lambda b: b[0][1] is None, zip(results, fleet))))
+failing = list(filter(lambda a: a[1] is not None and len(a[1].hashes) > 0, results))
+
+sender = slack.lookup_bot(oauth = os.environ.get("SLACK_OAUTH"))
+receiver = slack.lookup_channel(name = "github-actions")
+
+# Notifications for repositories on the same branch are merged into a single message
+queue = NotificationQueue(sender = sender, state = os.environ.get("SLACK_STATE") or None)
+
+# Branches where every repository passed start over, so the same issues coming back are posted again
+for branch in set(map(lambda a: a[0].branch, filter(lambda b: b[1] is not None, results))) - set(map(lambda c: c[0].branch, failing)) - set(map(lambda d: d.get("branch"), errors)):
+    queue.clear(receiver = receiver, branch = branch)
+
+if len(failing) > 0:
+
+    for git, report in failing:
+
+        blocks = [
+            {
+                "type": "section",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"The Github Actions autobuild for {git.repo} has halted because there are {len(report.hashes)} unresolved autolint issues. Please fix these problems and try again.",
+                    "emoji": True
+                }
+            }, {
+                "type": "actions",
+                "elements": [{
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": f"🐞  View {git.repo} Errors",
+                        "emoji": True
+                    },
+                    "url": f"https://github.com/{git.repo}/issues?q=is%3Aopen+is%3Aissue+label%3Aautolint",
+                    "style": "danger"
+                }]
+            }
+        ]
+
+        queue.push(receiver = receiver, branch = git.branch, blocks = blocks, issues = set(map(lambda a: f"{git.repo}:{a}", report.hashes)))
+
+    queue.flush()
+
+if len(errors) > 0:
+    print(f"Failed repositories: {', '.join(map(lambda a: a.get('repo'), errors))}")
+
+if len(failing) > 0 or len(errors) > 0:
+    sys.exit(1)
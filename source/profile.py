@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+from common.pylint import Linter
+
+# Profiles each pylint checker over the repository and, optionally, writes .pylintrc overlays
+# that move the most expensive & least useful checkers into a separate scheduled job
+
+linter = Linter()
+
+profile = linter.profile()
+profile.print()
+
+checkers = profile.expensive(
+    share = float(os.environ.get("PROFILE_SHARE") or 0.1), 
+    rate = float(os.environ.get("PROFILE_RATE") or 1)
+)
+
+print("")
+print(f"Expensive checkers: {', '.join(checkers) if len(checkers) > 0 else 'none'}")
+
+if len(checkers) > 0 and os.environ.get("PROFILE_OVERLAY"):
+    
+    paths = profile.overlays(directory = os.environ.get("PROFILE_OVERLAY"), checkers = checkers)
+    
+    print(f"Main overlay: {paths['main']}")
+    print(f"Scheduled overlay: {paths['scheduled']}")
@@ -1,4 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from .slack import slack
\ No newline at end of file
+from .slack import slack
+from .queue import NotificationQueue
+from .limits import RateLimiter
+from .errors import SlackRateLimited, SlackRequestFailed
\ No newline at end of file
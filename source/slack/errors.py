@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+class SlackRateLimited(Exception):
+    
+    """ Slack Rate Limited: Raised when a Slack method keeps returning HTTP 429 after every retry """
+    
+    pass
+    
+class SlackRequestFailed(Exception):
+    
+    """ Slack Request Failed: Raised when a Slack method returns a response that is not ok """
+    
+    pass
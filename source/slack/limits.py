@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+from typing import Dict, Union
+
+
+class RateLimiter:
+    
+    # Minimum number of seconds between calls for each Slack rate limit tier
+    # https://api.slack.com/docs/rate-limits
+    tiers = {
+        1: 60 / 1,
+        2: 60 / 20,
+        3: 60 / 50,
+        4: 60 / 100,
+        "special": 1
+    }
+    
+    # Methods that are not listed fall back to tier 3
+    methods = {
+        "chat.postMessage": "special",
+        "conversations.list": 2,
+        "users.list": 2,
+        "files.getUploadURLExternal": 4,
+        "files.completeUploadExternal": 4
+    }
+    
+    def __init__(self, clock = time.monotonic, sleep = time.sleep):
+        
+        self.clock = clock
+        self.sleep = sleep
+        
+        # The earliest time that the next call may be made for each (method, key)
+        self.schedule: Dict[tuple, float] = {}
+        
+    def interval(self, method: str) -> float:
+        
+        return self.tiers[self.methods.get(method, 3)]
+        
+    def scope(self, method: str, key: Union[str, None]) -> tuple:
+        
+        # Special tier methods are limited per channel, all other tiers are limited per method
+        return (method, key) if self.methods.get(method) == "special" else (method, None)
+    
+    def wait(self, method: str, key: str = None):
+        
+        scope = self.scope(method = method, key = key)
+        now = self.clock()
+        slot = max(now, self.schedule.get(scope, now))
+        
+        if slot > now:
+            self.sleep(slot - now)
+            
+        self.schedule[scope] = slot + self.interval(method = method)
+        
+    def defer(self, method: str, seconds: float, key: str = None):
+        
+        # Honour a Retry-After header by pushing the next slot back
+        scope = self.scope(method = method, key = key)
+        self.schedule[scope] = max(self.schedule.get(scope, 0), self.clock() + seconds)
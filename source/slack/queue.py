@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+
+from typing import Dict, List, Set
+
+from . import directories
+from .slack import slack
+
+
+class NotificationQueue:
+    
+    """ Notification Queue: Merges the notifications pushed during one run per channel & branch, and skips posting
+    one whose issues match the last message posted (recorded in the state file) """
+    
+    # Slack rejects messages with more than 50 blocks
+    max_blocks = 50
+    
+    def __init__(self, sender: directories.Bot, state: str = None):
+        
+        self.sender = sender
+        self.state = state
+        
+        # Pending digests keyed by (channel id, branch)
+        self.pending: Dict[tuple, Dict[str, any]] = {}
+        
+        # Fingerprint of the last message posted for each channel & branch
+        self.posted: Dict[str, str] = {}
+        
+        if self.state is not None and os.path.exists(self.state):
+            with open(self.state) as file:
+                self.posted = json.load(file)
+        
+    def push(self, receiver: directories.Channel, branch: str, blocks: List[Dict], issues: Set[str] = None):
+        
+        key = (receiver.id, branch)
+        
+        if key not in self.pending:
+            self.pending[key] = {"receiver": receiver, "branch": branch, "count": 0, "blocks": [], "issues": set()}
+        
+        digest = self.pending[key]
+        digest["count"] += 1
+        digest["issues"] |= set(issues or [])
+        
+        # Identical blocks from repeated notifications only need to be shown once
+        for block in blocks:
+            if block not in digest["blocks"]:
+                digest["blocks"].append(block)
+                
+    def flush(self) -> int:
+        
+        sent = 0
+        
+        for key, digest in list(self.pending.items()):
+            
+            del self.pending[key]
+            
+            fingerprint = self.fingerprint(digest = digest)
+            name = f"{key[0]}:{key[1]}"
+            
+            if self.posted.get(name) == fingerprint:
+                print(f"Skipping unchanged notification for {name}")
+                continue
+            
+            slack.send_blocks(blocks = self.compose(digest = digest), sender = self.sender, receiver = digest["receiver"])
+            
+            self.posted[name] = fingerprint
+            sent += 1
+            
+        if sent > 0:
+            self.save()
+                
+        return sent
+        
+    def clear(self, receiver: directories.Channel, branch: str):
+        
+        # After a clean run the same issues coming back are a new failure, so they must be posted again
+        name = f"{receiver.id}:{branch}"
+        
+        if name in self.posted:
+            del self.posted[name]
+            self.save()
+            
+    def save(self):
+        
+        if self.state is not None:
+            with open(self.state, "w") as file:
+                json.dump(self.posted, file)
+        
+    def fingerprint(self, digest: Dict[str, any]) -> str:
+        
+        # Prefer the issue set so that reworded messages for the same problems are not re-posted
+        if len(digest["issues"]) > 0:
+            content = "\n".join(sorted(digest["issues"]))
+        else:
+            content = json.dumps(digest["blocks"], sort_keys = True)
+            
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+        
+    def compose(self, digest: Dict[str, any]) -> List[Dict]:
+        
+        if digest["count"] == 1:
+            return digest["blocks"][:self.max_blocks]
+        
+        header = {
+            "type": "section",
+            "text": {
+                "type": "plain_text",
+                "text": f"{digest['count']} notifications were merged for the {digest['branch']} branch.",
+                "emoji": True
+            }
+        }
+        
+        return [header] + digest["blocks"][:self.max_blocks - 1]
@@ -2,55 +2,127 @@
 # -*- coding: utf-8 -*-
 
 from typing import Type, Dict, List, Tuple
+import os
 import requests
 import json
 
 from . import directories
+from .limits import RateLimiter
+from .errors import SlackRateLimited, SlackRequestFailed
 
 class slack:
     
     # Action Methods
     
-    api_url = lambda endpoint: f"https://slack.com/api/{endpoint}"
+    # The base url can be pointed at a local fake Slack server for testing
+    api_base = os.environ.get("SLACK_API_URL", "https://slack.com/api")
+    api_url = lambda endpoint: f"{slack.api_base}/{endpoint}"
+    
+    # A single pooled session keeps the TCP/TLS connection alive between calls
+    session = requests.Session()
+    limiter = RateLimiter()
+    retries = 3
     
     # @classmethod
     # def send_basic(cls, text: str, from: Type[Sender], to: Type[Recevier]):
     
     # "conversations.list"
     
+    @classmethod
+    def call(cls, method: str, payload: Dict[str, any], token: str, form: bool = False) -> Dict[str, any]:
+        
+        key = payload.get("channel", payload.get("channel_id"))
+        
+        for attempt in range(cls.retries + 1):
+            
+            cls.limiter.wait(method = method, key = key)
+            
+            # Some methods (e.g. files.getUploadURLExternal) only accept form encoded arguments
+            if form:
+                response = cls.session.post(
+                    url = cls.api_url(method), 
+                    data = payload,
+                    headers = {"Authorization": "Bearer {}".format(token)}
+                )
+            else:
+                response = cls.session.post(
+                    url = cls.api_url(method), 
+                    data = json.dumps(payload),
+                    headers = cls._slack_api_auth(token = token)
+                )
+            
+            if response.status_code == 429:
+                cls.limiter.defer(method = method, seconds = float(response.headers.get("Retry-After", 1)), key = key)
+                continue
+                
+            return response.json()
+            
+        raise SlackRateLimited(f"Slack method {method} was still rate limited after {cls.retries} retries")
+    
     @classmethod
     def send_blocks(cls, blocks: List[Dict], sender: directories.Bot, receiver: directories.Channel):
         
-        response = requests.post(
-            url = cls.api_url("chat.postMessage"), 
-            data = json.dumps({
+        response = cls.call(
+            method = "chat.postMessage", 
+            payload = {
                 "channel": receiver.id,
                 "token": sender.oauth,
                 "blocks": blocks
-            }),
-            headers = cls._slack_api_auth(token = sender.oauth)
+            },
+            token = sender.oauth
         )
         
         print(response)
-        print(response.json())
+        
+        if not response.get("ok", False):
+            raise SlackRequestFailed(f"chat.postMessage failed: {response.get('error')}")
         
     @classmethod
-    def send_file(cls, data: str, sender: directories.Bot, receiver: directories.Channel):
-    
-        response = requests.post(
-            url = cls.api_url("files.upload"),
-            data = json.dumps({
-                "channels": receiver.id,
-                "token": sender.oauth,
-                "file": data,
-                "filename": path.split("/")[-1],
-                "filetype": path.split(".")[-1]
-            }),
-            headers = cls._slack_api_auth(token = sender.oauth)
+    def send_file(cls, path: str, sender: directories.Bot, receiver: directories.Channel, title: str = None) -> str:
+        
+        # Uses the external upload flow so the file is streamed from disk rather than held in memory
+        # https://api.slack.com/messaging/files#uploading_files
+        filename = os.path.basename(path)
+        
+        ticket = cls.call(
+            method = "files.getUploadURLExternal",
+            payload = {
+                "filename": filename,
+                "length": os.path.getsize(path)
+            },
+            token = sender.oauth,
+            form = True
+        )
+        
+        if not ticket.get("ok", False):
+            raise SlackRequestFailed(f"files.getUploadURLExternal failed: {ticket.get('error')}")
+        
+        for attempt in range(cls.retries + 1):
+            
+            # Passing the open file lets requests send it in blocks with a known Content-Length
+            with open(path, "rb") as file:
+                upload = cls.session.post(url = ticket["upload_url"], data = file, headers = {"Content-Type": "application/octet-stream"})
+                
+            if upload.status_code == 200:
+                break
+        else:
+            raise SlackRequestFailed(f"Uploading {filename} failed with HTTP {upload.status_code}")
+        
+        response = cls.call(
+            method = "files.completeUploadExternal",
+            payload = {
+                "files": [{"id": ticket["file_id"], "title": title or filename}],
+                "channel_id": receiver.id
+            },
+            token = sender.oauth
         )
         
         print(response)
-        print(response.json())
+        
+        if not response.get("ok", False):
+            raise SlackRequestFailed(f"files.completeUploadExternal failed: {response.get('error')}")
+            
+        return ticket["file_id"]
     
     @classmethod
     def _slack_api_auth(cls, token: str) -> Dict[str, str]: